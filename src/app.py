@@ -20,10 +20,15 @@ import streamlit as st          # Web app framework
 import pandas as pd             # For reading CSV files
 import os                       # For file paths and environment variables
 import json                     # For saving/loading progress data
+import logging                  # For noting where the questions were loaded from
 from pathlib import Path        # For cross-platform file paths
-from openai import OpenAI       # For AI evaluation
 from dotenv import load_dotenv  # For loading .env file
 
+import evaluation               # OpenAI evaluation, prompts and caching
+from prefetch import Prefetcher # Gets the next question ready early
+from question_bank import QuestionBank  # Compiled questions for multi-worker mode
+from normalize import build_normalizers  # Canonical forms of answers
+
 # For browser localStorage (progress persistence)
 # Install with: pip install streamlit-js-eval
 from streamlit_js_eval import streamlit_js_eval
@@ -48,6 +53,10 @@ st.set_page_config(
 # File paths
 QUESTIONS_FILE = PROJECT_ROOT / "data" / "questions.csv"
 
+# Compiled, memory-mapped copy of the questions (set by launch_workers.py
+# so multiple app processes share one copy instead of each parsing the CSV)
+QUESTION_BANK_FILE = os.getenv("NMO_QUESTION_BANK")
+
 # localStorage key for saving progress
 STORAGE_KEY = "nmo_training_progress"
 
@@ -73,9 +82,21 @@ def load_questions():
         - question_type: 'text', 'yes_no', or 'choice'
         - choices: For 'choice' type, options separated by |
         - refer_to_trainer: 'yes' if trainer help needed for wrong answers
+        - synonyms: Optional answer synonyms (see normalize.py)
+
+    If NMO_QUESTION_BANK points at a compiled question bank that is up to
+    date with the CSV, it is read from there instead (see question_bank.py).
+    That saves parsing the CSV; each process still builds its own DataFrame.
     """
     try:
+        if QUESTION_BANK_FILE and Path(QUESTION_BANK_FILE).exists():
+            bank = QuestionBank(QUESTION_BANK_FILE)
+            if not bank.is_stale(QUESTIONS_FILE):
+                logging.info(f"Loaded {len(bank)} questions from question bank {QUESTION_BANK_FILE}")
+                return pd.DataFrame(bank.records(), columns=bank.columns)
+
         df = pd.read_csv(QUESTIONS_FILE)
+        logging.info(f"Loaded {len(df)} questions from {QUESTIONS_FILE}")
         return df
     except FileNotFoundError:
         st.error(f"Could not find {QUESTIONS_FILE}. Please make sure the file exists.")
@@ -85,12 +106,34 @@ def load_questions():
         st.stop()
 
 
+@st.cache_resource  # Compile the synonym tables once, not on every rerun
+def get_normalizers():
+    """
+    Return the answer normalizer for every question, keyed by question_id.
+
+    Built from the same questions (including their `synonyms` column) as
+    load_questions. See normalize.py for the normalization steps.
+    """
+    return build_normalizers(load_questions())
+
+
+@st.cache_resource  # One prefetcher (and one background thread) per server process
+def get_prefetcher():
+    """
+    Return the shared Prefetcher that gets the next question ready early.
+
+    See prefetch.py for details.
+    """
+    return Prefetcher()
+
+
 def get_openai_client():
     """
-    Create and return an OpenAI client.
+    Return the shared OpenAI client.
 
     The API key is loaded from the OPENAI_API_KEY environment variable,
-    which should be set in your .env file.
+    which should be set in your .env file. The client is created once per
+    process so its connections can be reused (see evaluation.py).
     """
     api_key = os.getenv("OPENAI_API_KEY")
 
@@ -98,10 +141,11 @@ def get_openai_client():
         st.error("OpenAI API key not found. Please add OPENAI_API_KEY to your .env file.")
         st.stop()
 
-    return OpenAI(api_key=api_key)
+    return evaluation.get_client()
 
 
-def evaluate_answer(question: str, correct_answer: str, user_answer: str, instructions: str) -> dict:
+def evaluate_answer(question: str, correct_answer: str, user_answer: str, instructions: str,
+                    normalized_answer: str = None) -> dict:
     """
     Use OpenAI to evaluate if the user's answer is correct.
 
@@ -110,78 +154,76 @@ def evaluate_answer(question: str, correct_answer: str, user_answer: str, instru
         correct_answer: The expected/correct answer criteria
         user_answer: What the user typed
         instructions: What to do if correct/incorrect (from CSV)
+        normalized_answer: Canonical form of the answer (see normalize.py),
+            so equivalent answers share one cached evaluation
 
     Returns:
         dict with keys:
             - is_correct (bool): Whether the answer is acceptable
             - feedback (str): Message to show the user
             - refer_to_trainer (bool): Whether to escalate to human trainer
+            - reference (dict or None): Lesson excerpt that covers the question
     """
-    client = get_openai_client()
+    # Make sure the API key is configured (shows an error and stops if not)
+    get_openai_client()
 
-    # Build the prompt for OpenAI
-    # We ask it to return JSON so we can parse the response reliably
-    system_prompt = """You are an evaluator for a missionary training program.
-Your job is to determine if a trainee's answer is acceptable and provide helpful feedback.
+    try:
+        # Prompt building, caching and the OpenAI call live in evaluation.py
+        with get_prefetcher().foreground():
+            return evaluation.evaluate(question, correct_answer, user_answer, instructions,
+                                       normalized_answer=normalized_answer, capture=True)
 
-You MUST respond with valid JSON in this exact format:
-{
-    "is_correct": true or false,
-    "feedback": "Your feedback message here",
-    "refer_to_trainer": true or false
-}
+    except Exception as e:
+        # Handle any errors (network issues, API errors, etc.)
+        st.error(f"Error calling OpenAI: {e}")
+        return {
+            "is_correct": False,
+            "feedback": "There was an error connecting to the evaluation service. Please try again.",
+            "refer_to_trainer": False
+        }
 
-Be encouraging but accurate. If the answer is partially correct, you may accept it
-but note what could be improved in your feedback."""
 
-    user_prompt = f"""Evaluate this trainee's answer:
+def show_lesson_reference(result: dict):
+    """
+    Show the part of the orientation course that covers this question.
 
-QUESTION: {question}
+    Only available when the lesson index has been built (see lesson_index.py).
+    """
+    reference = result.get("reference")
+    if not reference:
+        return
 
-CORRECT ANSWER CRITERIA: {correct_answer}
+    with st.expander(f"📖 Learn more: {reference['lesson']}"):
+        if reference.get("module"):
+            st.caption(reference["module"])
+        st.markdown(reference["excerpt"])
 
-INSTRUCTIONS FOR EVALUATION: {instructions}
 
-TRAINEE'S ANSWER: {user_answer}
+def prefetch_next_question(questions_df, next_index: int):
+    """
+    Start getting the next question ready while the user reads their feedback.
 
-Remember to respond with JSON only."""
+    Only one prefetch is scheduled per question per session.
+    """
+    if next_index >= len(questions_df):
+        return
 
-    try:
-        # Call OpenAI API
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Use gpt-4o-mini for cost efficiency
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"},  # Force JSON response
-            temperature=0.3  # Lower temperature = more consistent responses
-        )
+    job = st.session_state.prefetch_job
+    next_question = questions_df.iloc[next_index]
+    if job is not None and job.question_id == next_question["question_id"]:
+        return  # Already scheduled
 
-        # Parse the JSON response
-        result = json.loads(response.choices[0].message.content)
+    cancel_prefetch()
+    normalizer = get_normalizers().get(next_question["question_id"])
+    st.session_state.prefetch_job = get_prefetcher().schedule(next_question.to_dict(), normalizer)
 
-        return {
-            "is_correct": result.get("is_correct", False),
-            "feedback": result.get("feedback", "Unable to evaluate your answer."),
-            "refer_to_trainer": result.get("refer_to_trainer", False)
-        }
 
-    except json.JSONDecodeError:
-        # If OpenAI didn't return valid JSON, handle gracefully
-        return {
-            "is_correct": False,
-            "feedback": "There was an error evaluating your answer. Please try again.",
-            "refer_to_trainer": False
-        }
-    except Exception as e:
-        # Handle any other errors (network issues, API errors, etc.)
-        st.error(f"Error calling OpenAI: {e}")
-        return {
-            "is_correct": False,
-            "feedback": "There was an error connecting to the evaluation service. Please try again.",
-            "refer_to_trainer": False
-        }
+def cancel_prefetch():
+    """Cancel this session's prefetch job, if any (e.g. when the user submits)."""
+    job = st.session_state.get("prefetch_job")
+    if job is not None and not job.done():
+        job.cancel()
+    st.session_state.prefetch_job = None
 
 
 def save_progress():
@@ -262,6 +304,7 @@ def initialize_session_state():
         - show_feedback: Whether to show the evaluation result
         - last_result: The last evaluation result from OpenAI
         - progress_loaded: Whether we've tried to load saved progress
+        - prefetch_job: The background job preparing the next question
     """
     if "current_question_index" not in st.session_state:
         st.session_state.current_question_index = 0
@@ -281,6 +324,9 @@ def initialize_session_state():
     if "progress_loaded" not in st.session_state:
         st.session_state.progress_loaded = False
 
+    if "prefetch_job" not in st.session_state:
+        st.session_state.prefetch_job = None
+
 
 def render_question(question_row):
     """
@@ -434,13 +480,20 @@ def main():
         user_answer = render_question(current_question)
 
         if user_answer is not None:
+            # Real work comes first - stop any prefetching for this session
+            cancel_prefetch()
+
+            # Canonical form of the answer ("IDK" -> "i dont know") for caching
+            normalizer = get_normalizers()[current_question["question_id"]]
+
             # User submitted an answer - evaluate it
             with st.spinner("Evaluating your answer..."):
                 result = evaluate_answer(
                     question=current_question["question"],
                     correct_answer=current_question["correct_answer"],
                     user_answer=user_answer,
-                    instructions=current_question.get("feedback_incorrect", "")
+                    instructions=current_question.get("feedback_incorrect", ""),
+                    normalized_answer=normalizer(user_answer)
                 )
 
             # Store the result and show feedback
@@ -464,6 +517,8 @@ def main():
             if pd.notna(current_question.get("feedback_correct")):
                 st.info(current_question["feedback_correct"])
 
+            show_lesson_reference(result)
+
             # Mark as completed
             question_id = current_question["question_id"]
             if question_id not in st.session_state.completed_questions:
@@ -472,6 +527,9 @@ def main():
             # Save progress
             save_progress()
 
+            # Get the next question ready while the user reads this feedback
+            prefetch_next_question(questions_df, current_index + 1)
+
             # Show "Continue" button
             if st.button("Continue to Next Question", type="primary"):
                 st.session_state.current_question_index += 1
@@ -488,6 +546,8 @@ def main():
             if result.get("refer_to_trainer") or current_question.get("refer_to_trainer") == "yes":
                 st.warning("Please contact your trainer for assistance with this question.")
 
+            show_lesson_reference(result)
+
             # Show "Try Again" button
             if st.button("Try Again"):
                 st.session_state.show_feedback = False
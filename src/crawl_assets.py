@@ -0,0 +1,198 @@
+"""Download the images and videos a crawl links to
+
+AssetDownloader fetches asset URLs concurrently over one pooled aiohttp
+session (limited per host) into `<output_dir>/assets/`. Files are named by
+the hash of their content, so the same image used by several lessons, or
+served under several URLs, is stored once. `assets.json` remembers each
+URL's file, ETag and Last-Modified: a later run sends conditional requests
+and keeps the file on 304 Not Modified, and an interrupted run resumes
+where it stopped.
+
+Check it against a local HTTP server:
+    python src/crawl_assets.py --check
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import aiohttp
+
+MANIFEST_FILENAME = "assets.json"
+CHUNK_SIZE = 64 * 1024
+
+
+def _extension(url, content_type):
+    suffix = Path(urlsplit(url).path).suffix.lower()
+    if suffix and len(suffix) <= 6:
+        return suffix
+    return mimetypes.guess_extension((content_type or '').split(';')[0].strip()) or ''
+
+
+class AssetDownloader:
+    def __init__(self, output_dir, per_host=4, total=16, timeout=120):
+        self.output_dir = Path(output_dir)
+        self.assets_dir = self.output_dir / "assets"
+        self.assets_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.assets_dir / MANIFEST_FILENAME
+        self.per_host = per_host
+        self.total = total
+        self.timeout = timeout
+
+        # url -> {'file', 'etag', 'last_modified'}
+        self.assets = {}
+        if self.manifest_path.exists():
+            self.assets = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+
+        self.session = None
+        self._in_flight = {}
+        self.counts = {'downloaded': 0, 'not_modified': 0, 'duplicate': 0, 'failed': 0}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.total, limit_per_host=self.per_host)
+        self.session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.session.close()
+        self.save_manifest()
+        logging.info(f"Assets: {self.counts['downloaded']} downloaded, {self.counts['not_modified']} not modified, "
+                     f"{self.counts['duplicate']} duplicate, {self.counts['failed']} failed")
+
+    def save_manifest(self):
+        temp_path = self.manifest_path.with_suffix('.tmp')
+        temp_path.write_text(json.dumps(self.assets, indent=2), encoding='utf-8')
+        os.replace(temp_path, self.manifest_path)
+
+    async def fetch_all(self, urls):
+        """Download several URLs; returns {url: file path} for the ones that succeeded"""
+        urls = list(dict.fromkeys(u for u in urls if u.startswith(('http://', 'https://'))))
+        paths = await asyncio.gather(*(self.fetch(url) for url in urls))
+        return {url: path for url, path in zip(urls, paths) if path is not None}
+
+    async def fetch(self, url):
+        """Download one URL (once, however many lessons ask for it); returns its file path or None"""
+        if url not in self._in_flight:
+            self._in_flight[url] = asyncio.ensure_future(self._download(url))
+        return await self._in_flight[url]
+
+    async def _download(self, url):
+        entry = self.assets.get(url)
+        known_file = entry and (self.assets_dir / entry['file']).exists()
+
+        headers = {}
+        if known_file:
+            if not entry.get('etag') and not entry.get('last_modified'):
+                # Nothing to revalidate with; the file from the last run is kept
+                return self.assets_dir / entry['file']
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        temp_path = self.assets_dir / f".{uuid.uuid4().hex}.part"
+        try:
+            async with self.session.get(url, headers=headers) as response:
+                if response.status == 304 and known_file:
+                    self.counts['not_modified'] += 1
+                    return self.assets_dir / entry['file']
+                response.raise_for_status()
+
+                digest = hashlib.sha256()
+                with open(temp_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        digest.update(chunk)
+                        f.write(chunk)
+
+                filename = digest.hexdigest()[:20] + _extension(url, response.headers.get('Content-Type'))
+                target = self.assets_dir / filename
+                if target.exists():
+                    self.counts['duplicate'] += 1
+                    temp_path.unlink()
+                else:
+                    self.counts['downloaded'] += 1
+                    os.replace(temp_path, target)
+
+                self.assets[url] = {
+                    'file': filename,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                }
+                return target
+        except Exception as e:
+            self.counts['failed'] += 1
+            logging.warning(f"   Could not download {url}: {e}")
+            if temp_path.exists():
+                temp_path.unlink()
+            return None
+
+
+async def run_check():
+    """Serve a few files locally and check downloading, dedup and revalidation"""
+    from aiohttp import web
+
+    image = os.urandom(50000)
+    requests = []
+
+    async def handle(request):
+        requests.append((request.path, request.headers.get('If-None-Match')))
+        if request.path == '/missing.png':
+            return web.Response(status=404)
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304)
+        # /a.png and /copy.png are the same image
+        return web.Response(body=image, content_type='image/png', headers={'ETag': '"v1"'})
+
+    app = web.Application()
+    app.router.add_get('/{name}', handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+    urls = [f"{base}/a.png", f"{base}/copy.png", f"{base}/a.png", f"{base}/missing.png"]
+
+    output_dir = tempfile.mkdtemp()
+    try:
+        async with AssetDownloader(output_dir) as downloader:
+            first = await downloader.fetch_all(urls)
+            first_counts = dict(downloader.counts)
+        async with AssetDownloader(output_dir) as downloader:
+            second = await downloader.fetch_all(urls)
+            second_counts = dict(downloader.counts)
+    finally:
+        await runner.cleanup()
+
+    files = [p for p in Path(output_dir, 'assets').iterdir() if p.name != MANIFEST_FILENAME]
+    checks = [
+        ("same content stored once", len(files) == 1 and files[0].read_bytes() == image),
+        ("duplicate URL requested once", [p for p, _ in requests[:3]].count('/a.png') == 1),
+        ("first run counts", first_counts == {'downloaded': 1, 'not_modified': 0, 'duplicate': 1, 'failed': 1}),
+        ("second run revalidates", second_counts == {'downloaded': 0, 'not_modified': 2, 'duplicate': 0, 'failed': 1}),
+        ("same paths both runs", first == second and len(first) == 2),
+    ]
+    for name, ok in checks:
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+    return all(ok for _, ok in checks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Asset downloader for crawled courses.")
+    parser.add_argument("--check", action="store_true", help="Check the downloader against a local HTTP server.")
+    args = parser.parse_args()
+
+    if args.check:
+        logging.basicConfig(level=logging.WARNING)
+        raise SystemExit(0 if asyncio.run(run_check()) else 1)
+    parser.print_help()
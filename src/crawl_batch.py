@@ -0,0 +1,165 @@
+"""Crawl many Rise 360 courses with one shared browser
+
+Reads a YAML file listing the courses:
+
+    defaults:            # optional, applied to every course
+      concurrency: 2
+      block: standard
+    courses:
+      - url: https://rise.articulate.com/share/...
+        output_dir: output/course-a
+      - url: https://rise.articulate.com/share/...
+        output_dir: output/course-b
+        extraction: network
+
+Courses run at the same time (up to --max-courses) in one Chromium. Every
+page has its own browser context, so courses don't share cookies or
+storage, and --max-pages caps the number of open pages across all of
+them. A course that fails doesn't stop the others; the summary lists the
+time, lesson count and failures of each.
+
+    python src/crawl_batch.py courses.yaml --report batch_report.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+
+import yaml
+from playwright.async_api import async_playwright
+
+from crawl_blocking import DEFAULT_PROFILE
+from crawl_readiness import ReadinessTimeouts
+from crawler import Rise360Crawler
+
+# Per-course settings and their defaults (Rise360Crawler keyword arguments)
+COURSE_OPTIONS = {
+    'concurrency': 1,
+    'extraction': 'script',
+    'incremental': False,
+    'block': DEFAULT_PROFILE,
+    'download_assets': False,
+    'lesson_timeout_ms': ReadinessTimeouts.lesson_content,
+    'dom_quiet_ms': ReadinessTimeouts.dom_quiet,
+    'resume': False,
+    'retries': 2,
+}
+
+
+def load_batch(path):
+    """Read the batch file into a list of course dicts with every option filled in"""
+    with open(path, encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+
+    defaults = dict(COURSE_OPTIONS, **(config.get('defaults') or {}))
+    courses = []
+    output_dirs = set()
+    for i, entry in enumerate(config.get('courses') or [], 1):
+        if not entry.get('url') or not entry.get('output_dir'):
+            raise ValueError(f"Course {i} in {path} needs a 'url' and an 'output_dir'")
+        unknown = set(entry) - set(COURSE_OPTIONS) - {'url', 'output_dir'}
+        if unknown:
+            raise ValueError(f"Course {i} in {path} has unknown settings: {', '.join(sorted(unknown))}")
+        # Two courses writing to one directory would overwrite each other
+        output_dir = str(Path(entry['output_dir']).resolve())
+        if output_dir in output_dirs:
+            raise ValueError(f"Course {i} in {path} reuses output_dir {entry['output_dir']}")
+        output_dirs.add(output_dir)
+        courses.append(dict(defaults, **entry))
+
+    if not courses:
+        raise ValueError(f"No courses in {path}")
+    return courses
+
+
+async def crawl_one(course, browser, page_slots):
+    """Crawl one course in the shared browser; returns its summary"""
+    result = {'url': course['url'], 'output_dir': course['output_dir'],
+              'lessons': 0, 'failed': [], 'error': None}
+    started = time.monotonic()
+    timeouts = ReadinessTimeouts(lesson_content=course['lesson_timeout_ms'], dom_quiet=course['dom_quiet_ms'])
+    try:
+        async with Rise360Crawler(
+            course['url'], course['output_dir'], headless=True, concurrency=course['concurrency'],
+            timeouts=timeouts, extraction=course['extraction'], incremental=course['incremental'],
+            block_profile=course['block'], download_assets=course['download_assets'],
+            resume=course['resume'], max_retries=course['retries'],
+            browser=browser, page_slots=page_slots,
+        ) as crawler:
+            try:
+                await crawler.run()
+            finally:
+                if crawler.course_structure:
+                    result['lessons'] = 1 + sum(len(m['lessons']) for m in crawler.course_structure['modules'])
+                result['failed'] = list(crawler.failed_lessons)
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = round(time.monotonic() - started, 1)
+    return result
+
+
+async def run_batch(courses, max_courses=2, max_pages=4, headless=True):
+    """Crawl every course, at most `max_courses` at a time; returns one summary per course"""
+    # Every running course keeps one page open, so it needs at least one slot
+    max_pages = max(max_pages, max_courses)
+    # A course can't have more pages open than there are slots
+    for course in courses:
+        if course['concurrency'] > max_pages:
+            logging.warning(f"{course['url']}: concurrency {course['concurrency']} lowered to "
+                            f"--max-pages {max_pages}")
+            course['concurrency'] = max_pages
+    course_slots = asyncio.Semaphore(max_courses)
+    page_slots = asyncio.Semaphore(max_pages)
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=headless)
+
+        async def scheduled(course):
+            async with course_slots:
+                logging.info(f"Starting course: {course['url']}")
+                return await crawl_one(course, browser, page_slots)
+
+        try:
+            return await asyncio.gather(*(scheduled(course) for course in courses))
+        finally:
+            await browser.close()
+
+
+def log_summary(results):
+    logging.info("\n" + "="*60)
+    logging.info("BATCH SUMMARY")
+    logging.info("="*60)
+    for result in results:
+        status = "FAILED" if result['error'] else "ok"
+        logging.info(f"{status:6} {result['seconds']:7.1f}s  {result['lessons']:3} lessons  "
+                     f"{len(result['failed'])} failed  {result['output_dir']}")
+        if result['error']:
+            logging.info(f"       error: {result['error']}")
+        for title in result['failed']:
+            logging.info(f"       failed lesson: {title}")
+    failed_courses = sum(1 for r in results if r['error'])
+    logging.info(f"{len(results) - failed_courses}/{len(results)} courses crawled")
+    logging.info("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Crawl several Rise360 courses with one shared browser.")
+    parser.add_argument("batch_file", help="YAML file listing the courses (see module docstring).")
+    parser.add_argument("--max-courses", type=int, default=2, help="Courses crawled at the same time.")
+    parser.add_argument("--max-pages", type=int, default=4, help="Open pages (browser contexts) across all courses.")
+    parser.add_argument("--report", help="Also write the summary to this JSON file.")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_batch(load_batch(args.batch_file), args.max_courses, args.max_pages,
+                                    headless=not args.headed))
+    log_summary(results)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    raise SystemExit(1 if any(r['error'] for r in results) else 0)
@@ -0,0 +1,113 @@
+"""Resource blocking profiles for crawls
+
+The extractors only read text and attribute values (image `src`, video
+`src`, iframe `src`, link `href`), so the bodies of images, fonts, media
+streams and analytics scripts never need to be downloaded. A profile says
+which of those kinds of requests are aborted; the `src` attributes stay in
+the DOM either way.
+
+Per page, ResourceStats counts blocked requests and the bytes that were
+loaded (from Content-Length, so responses without one are not counted).
+"""
+
+import re
+from collections import Counter
+from urllib.parse import urlsplit
+
+# What each profile blocks
+PROFILES = {
+    'none': set(),
+    'analytics': {'analytics'},
+    'standard': {'analytics', 'font', 'media'},
+    'text': {'analytics', 'font', 'media', 'image'},
+}
+
+DEFAULT_PROFILE = 'standard'
+
+ANALYTICS_HOSTS = (
+    'googletagmanager.com',
+    'google-analytics.com',
+    'doubleclick.net',
+    'segment.io',
+    'segment.com',
+    'hotjar.com',
+    'fullstory.com',
+    'nr-data.net',
+    'newrelic.com',
+    'intercom.io',
+)
+
+# Media streamed over XHR (HLS/DASH segments) has resource type 'xhr', so also match on extension
+MEDIA_URL = re.compile(r'\.(mp4|webm|mov|m3u8|m4s|mp3|m4a|ogg|wav)(\?|$)', re.IGNORECASE)
+FONT_URL = re.compile(r'\.(woff2?|ttf|otf|eot)(\?|$)', re.IGNORECASE)
+
+
+def request_kind(url, resource_type):
+    """Which blockable kind a request is ('analytics', 'font', 'media', 'image'), or None"""
+    host = urlsplit(url).hostname or ''
+    if any(host == h or host.endswith('.' + h) for h in ANALYTICS_HOSTS):
+        return 'analytics'
+    if resource_type == 'font' or FONT_URL.search(url):
+        return 'font'
+    if resource_type == 'media' or MEDIA_URL.search(url):
+        return 'media'
+    if resource_type == 'image':
+        return 'image'
+    return None
+
+
+class ResourceStats:
+    """Blocked requests and loaded bytes for one page"""
+
+    def __init__(self):
+        self.blocked = Counter()
+        self.requests = 0
+        self.bytes_loaded = 0
+
+    def snapshot(self):
+        return {'requests': self.requests, 'bytes_loaded': self.bytes_loaded,
+                'blocked': dict(self.blocked)}
+
+    def since(self, snapshot):
+        """What happened since `snapshot` was taken"""
+        blocked = Counter(self.blocked)
+        blocked.subtract(snapshot['blocked'])
+        return {
+            'requests': self.requests - snapshot['requests'],
+            'bytes_loaded': self.bytes_loaded - snapshot['bytes_loaded'],
+            'blocked': {kind: n for kind, n in blocked.items() if n},
+        }
+
+
+async def apply_profile(page, profile):
+    """Block the profile's request kinds on a page and start counting; returns its ResourceStats"""
+    blocked_kinds = PROFILES[profile]
+    stats = ResourceStats()
+
+    def on_response(response):
+        stats.requests += 1
+        length = response.headers.get('content-length')
+        if length and length.isdigit():
+            stats.bytes_loaded += int(length)
+
+    page.on('response', on_response)
+
+    if blocked_kinds:
+        async def handle(route):
+            request = route.request
+            kind = request_kind(request.url, request.resource_type)
+            if kind in blocked_kinds:
+                stats.blocked[kind] += 1
+                await route.abort('blockedbyclient')
+            else:
+                # Let other route handlers (if any) see the request
+                await route.fallback()
+
+        await page.route('**/*', handle)
+
+    return stats
+
+
+def format_stats(stats):
+    blocked = ', '.join(f"{n} {kind}" for kind, n in sorted(stats['blocked'].items())) or 'none'
+    return f"{stats['requests']} requests, {stats['bytes_loaded'] / 1024:.0f} KB loaded, blocked: {blocked}"
@@ -0,0 +1,118 @@
+"""Convert captured lesson HTML into structured markdown
+
+The crawler keeps each lesson's content HTML, so headings, lists, tables
+and inline links survive (inner_text flattens them). Parsing HTML is CPU
+work, so MarkdownConverter runs it in a process pool and the Playwright
+event loop never waits on it.
+
+Every crawled lesson is also cached as JSON in `<output_dir>/html_cache/`,
+so the markdown can be regenerated later without a browser:
+
+    python src/crawl_convert.py --output-dir output
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from markdownify import markdownify
+
+CACHE_DIRNAME = "html_cache"
+
+# Not part of the lesson text: images, videos and embeds are listed in
+# their own markdown sections
+STRIP_TAGS = ['script', 'style', 'noscript', 'svg', 'button', 'nav', 'img', 'iframe', 'video', 'audio']
+
+# Lesson headings go under the page's "## Lesson Content" section, so h1 becomes ###
+HEADING_SHIFT = 2
+
+
+def html_to_markdown(html):
+    """Structured markdown for a lesson's content HTML"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup.find_all(STRIP_TAGS):
+        tag.decompose()
+    for heading in soup.find_all(re.compile(r'^h[1-6]$')):
+        heading.name = f"h{min(6, int(heading.name[1]) + HEADING_SHIFT)}"
+
+    markdown = markdownify(str(soup), heading_style='ATX', bullets='-')
+    lines = [line.rstrip() for line in markdown.splitlines()]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+
+class MarkdownConverter:
+    """Runs html_to_markdown in worker processes"""
+
+    def __init__(self, workers=2):
+        # 'spawn' so workers don't inherit the browser driver's threads and pipes
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+    async def convert(self, html):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, html_to_markdown, html)
+
+    def close(self):
+        self.pool.shutdown()
+
+
+def cache_path(output_dir, filepath):
+    """Where the cached lesson for a markdown file lives"""
+    relative = os.path.relpath(filepath, output_dir)
+    return Path(output_dir) / CACHE_DIRNAME / (os.path.splitext(relative)[0] + '.json')
+
+
+def save_cached_lesson(output_dir, filepath, lesson, content):
+    """Cache what's needed to render a lesson again: its place in the course and its content"""
+    path = cache_path(output_dir, filepath)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {'filepath': os.path.relpath(filepath, output_dir), 'lesson': lesson,
+            'content': {key: value for key, value in content.items() if key != 'markdown'}}
+    temp_path = path.with_suffix('.tmp')
+    temp_path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    os.replace(temp_path, path)
+
+
+def load_cached_lessons(output_dir):
+    for path in sorted((Path(output_dir) / CACHE_DIRNAME).rglob('*.json')):
+        yield json.loads(path.read_text(encoding='utf-8'))
+
+
+async def reconvert(output_dir, workers):
+    """Regenerate every cached lesson's markdown file"""
+    from crawler import Rise360Crawler
+
+    # Only used for its markdown generators; no browser is started
+    crawler = Rise360Crawler("offline", output_dir)
+    converter = MarkdownConverter(workers)
+    try:
+        cached = list(load_cached_lessons(output_dir))
+        markdowns = await asyncio.gather(*(converter.convert(c['content'].get('html') or '') for c in cached))
+    finally:
+        converter.close()
+
+    for entry, markdown in zip(cached, markdowns):
+        content = dict(entry['content'], markdown=markdown)
+        filepath = os.path.join(output_dir, entry['filepath'])
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(crawler._render_markdown(entry['lesson'], content))
+        logging.info(f"✓ Saved to: {filepath}")
+    return len(cached)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Regenerate lesson markdown from the HTML cache of a crawl.")
+    parser.add_argument("--output-dir", default="output", help="Output directory of the crawl.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Conversion processes.")
+    args = parser.parse_args()
+
+    count = asyncio.run(reconvert(args.output_dir, args.workers))
+    logging.info(f"Converted {count} lessons")
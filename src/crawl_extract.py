@@ -0,0 +1,159 @@
+"""Single round-trip lesson extraction
+
+Runs one script inside the course frame that finds the lesson content and
+returns its text, HTML, images, videos/iframes and links as one JSON payload,
+with the same deduplication and filtering as the per-element extractor
+(Rise360Crawler._extract_lesson_content_per_element).
+
+Benchmark against the per-element path on a local fixture:
+    python src/crawl_extract.py --benchmark --images 60 --links 60
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+
+# Same order as the per-element extractor: the first match wins
+CONTENT_SELECTORS = [
+    "main",
+    "article",
+    "[role='main']",
+    "[class*='lesson__content']"
+]
+
+EXTRACT_SCRIPT = """(selectors) => {
+    let root = null;
+    for (const selector of selectors) {
+        root = document.querySelector(selector);
+        if (root) break;
+    }
+    if (!root) return null;
+
+    const images = [];
+    const seenImages = new Set();
+    for (const img of root.querySelectorAll('img')) {
+        const src = img.getAttribute('src');
+        if (src && !seenImages.has(src) && !src.toLowerCase().includes('logo')) {
+            seenImages.add(src);
+            images.push({
+                src: src,
+                alt: img.getAttribute('alt') || '',
+                title: img.getAttribute('title') || ''
+            });
+        }
+    }
+
+    const videos = [];
+    for (const video of root.querySelectorAll('video')) {
+        const src = video.getAttribute('src');
+        if (src) videos.push({type: 'video', url: src});
+    }
+    for (const iframe of root.querySelectorAll('iframe')) {
+        const src = iframe.getAttribute('src');
+        // Skip navigation iframes
+        if (src && !src.includes('googletagmanager')) videos.push({type: 'iframe', url: src});
+    }
+
+    const links = [];
+    const seenLinks = new Set();
+    for (const link of root.querySelectorAll("a[href^='http']")) {
+        const href = link.getAttribute('href');
+        const text = link.innerText.trim();
+        if (href && !seenLinks.has(href) && text) {
+            seenLinks.add(href);
+            links.push({url: href, text: text});
+        }
+    }
+
+    return {text: root.innerText, html: root.innerHTML, images: images, videos: videos, links: links};
+}"""
+
+
+async def extract_lesson_payload(frame):
+    """Extract the current lesson in one round trip
+
+    Returns the content dict ('text', 'html', 'images', 'videos', 'links'), or None
+    if no content element was found.
+    """
+    return await frame.evaluate(EXTRACT_SCRIPT, CONTENT_SELECTORS)
+
+
+def synthetic_lesson_html(images=30, videos=3, links=30):
+    """A Rise-like lesson page with media, duplicates and things to filter out"""
+    parts = ["<html><body>",
+             "<nav><a href='#/lessons/1'>Lesson One</a><a href='#/lessons/2'>Lesson Two</a></nav>",
+             "<main><h1>Synthetic Lesson</h1>",
+             "<img src='https://cdn.example.com/logo.png' alt='Logo'>"]
+    for i in range(images):
+        parts.append(f"<p>Paragraph {i} of the lesson body text.</p>")
+        parts.append(f"<img src='https://cdn.example.com/img/{i}.png' alt='Image {i}' title='Figure {i}'>")
+        if i % 5 == 0:
+            # Same image twice - should only be reported once
+            parts.append(f"<img src='https://cdn.example.com/img/{i}.png' alt='Duplicate'>")
+    for i in range(videos):
+        parts.append(f"<video src='https://cdn.example.com/video/{i}.mp4'></video>")
+        parts.append(f"<iframe src='https://player.example.com/embed/{i}'></iframe>")
+    parts.append("<iframe src='https://www.googletagmanager.com/ns.html'></iframe>")
+    for i in range(links):
+        parts.append(f"<a href='https://example.com/resource/{i}'>Resource {i}</a>")
+    parts.append("<a href='https://example.com/resource/0'>Resource 0 again</a>")
+    parts.append("<a href='https://example.com/empty'> </a>")
+    parts.append("</main></body></html>")
+    return "\n".join(parts)
+
+
+async def run_benchmark(images, videos, links, rounds):
+    from playwright.async_api import async_playwright
+    from crawler import Rise360Crawler
+
+    logging.getLogger().setLevel(logging.WARNING)
+    html = synthetic_lesson_html(images, videos, links)
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(html)
+        frame = page.main_frame
+
+        crawler = Rise360Crawler("about:blank", output_dir=tempfile.mkdtemp())
+        engines = [
+            ("per-element", crawler._extract_lesson_content_per_element),
+            ("single script", crawler._extract_lesson_content_in_page),
+        ]
+
+        results = {}
+        for name, extract in engines:
+            timings = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                results[name] = await extract(frame)
+                timings.append(time.perf_counter() - started)
+            results[name + " time"] = sorted(timings)[len(timings) // 2]
+
+        await browser.close()
+
+    same = results["per-element"] == results["single script"]
+    content = results["single script"]
+    print(f"Fixture: {len(content['images'])} images, {len(content['videos'])} videos, "
+          f"{len(content['links'])} links (median of {rounds} rounds)")
+    for name, _ in engines:
+        print(f"  {name:14} {results[name + ' time'] * 1000:8.1f} ms")
+    print(f"  speedup        {results['per-element time'] / results['single script time']:8.1f}x")
+    print(f"  identical output: {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark lesson extraction engines on a local fixture.")
+    parser.add_argument("--benchmark", action="store_true", help="Run the benchmark.")
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--videos", type=int, default=3)
+    parser.add_argument("--links", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        asyncio.run(run_benchmark(args.images, args.videos, args.links, args.rounds))
+    else:
+        parser.print_help()
@@ -0,0 +1,310 @@
+"""Offline Rise-like course server and crawler benchmark
+
+Serves a synthetic course that behaves like a Rise 360 share where the
+crawler cares: a START COURSE button that opens the course in an iframe,
+course data fetched as JSON, a sidebar of sections and lessons, and
+lessons rendered client-side (after a delay) when their link is clicked.
+Lesson count, images, links and latency (server and in-page rendering)
+are configurable.
+
+Serve it to poke at by hand:
+    python src/crawl_fixture.py --serve --port 8765 --lessons 20
+
+Benchmark the crawler against it (headless), comparing settings:
+    python src/crawl_fixture.py --benchmark --lessons 20 --latency-ms 50 \\
+        --concurrency 1 4 --extraction script network
+
+For each run the benchmark reports wall time, time per lesson, Playwright
+round trips (messages sent to the driver) and the peak memory of the whole
+process tree (Python, Playwright driver and Chromium; Linux only).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+
+from aiohttp import web
+
+from crawl_readiness import ReadinessTimeouts
+from crawl_tracing import PlaywrightCallCounter
+from crawler import Rise360Crawler
+
+# 1x1 transparent PNG
+PIXEL_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d4944415478da63f8ffff3f0005fe02fea7d6a4c5"
+    "0000000049454e44ae426082"
+)
+
+SHARE_PAGE = """<!DOCTYPE html>
+<html><head><title>Fixture Course</title></head>
+<body>
+<button onclick="startCourse()">START COURSE</button>
+<script>
+function startCourse() {
+    document.querySelector('button').remove();
+    const frame = document.createElement('iframe');
+    frame.src = '/course/index.html';
+    frame.style = 'width: 100%; height: 900px; border: 0';
+    document.body.appendChild(frame);
+}
+</script>
+</body></html>"""
+
+COURSE_PAGE = """<!DOCTYPE html>
+<html><head><title>Loading</title></head>
+<body>
+<nav></nav>
+<div class="lesson-shell"></div>
+<script>
+const RENDER_MS = %(render_ms)d;
+let course = null;
+
+function blockHtml(block) {
+    return block.items.map(item => {
+        if (block.type === 'text') return '<h2>' + item.heading + '</h2>' + item.paragraph;
+        if (block.type === 'image') {
+            const image = item.media.image;
+            return '<figure><img src="' + image.originalUrl + '" alt="' + image.altText + '"></figure>';
+        }
+        return '';
+    }).join('');
+}
+
+function showLesson() {
+    if (!course) return;
+    const id = location.hash.replace('#/lessons/', '');
+    const lesson = course.lessons.find(l => l.id === id);
+    for (const a of document.querySelectorAll('nav a')) {
+        if (a.getAttribute('href') === location.hash) a.setAttribute('aria-current', 'page');
+        else a.removeAttribute('aria-current');
+    }
+    const shell = document.querySelector('.lesson-shell');
+    shell.innerHTML = '';
+    if (!lesson) return;
+    setTimeout(() => {
+        shell.innerHTML = '<main class="lesson__content"><h1>' + lesson.title + '</h1>'
+            + lesson.items.map(blockHtml).join('') + '</main>';
+    }, RENDER_MS);
+}
+
+fetch('/api/course.json').then(r => r.json()).then(data => {
+    course = data.course;
+    document.title = course.title;
+    let html = '<ol>';
+    let sectionOpen = false;
+    for (const lesson of course.lessons) {
+        if (lesson.type === 'section') {
+            if (sectionOpen) html += '</ol></li>';
+            html += '<li class="outline-section"><div class="outline-section__title">' + lesson.title + '</div><ol>';
+            sectionOpen = true;
+        } else {
+            html += '<li class="outline-lesson"><a href="#/lessons/' + lesson.id + '">' + lesson.title + '</a></li>';
+        }
+    }
+    if (sectionOpen) html += '</ol></li>';
+    document.querySelector('nav').innerHTML = html + '</ol>';
+    showLesson();
+});
+window.addEventListener('hashchange', showLesson);
+</script>
+</body></html>"""
+
+
+def synthetic_course(base_url, lessons=20, lessons_per_module=4, images=5, links=5, paragraphs=5):
+    """Course data in the shape Rise sends it: a lesson list with section entries"""
+    entries = []
+    for n in range(lessons):
+        if n > 0 and (n - 1) % lessons_per_module == 0:
+            module = (n - 1) // lessons_per_module + 1
+            entries.append({'id': f"s{module}", 'title': f"Module {module}", 'type': 'section'})
+
+        blocks = []
+        for p in range(paragraphs):
+            link_html = ''.join(
+                f' See <a href="https://example.com/resources/{n}-{k}">Resource {n}.{k}</a>.'
+                for k in range(links) if k % paragraphs == p
+            )
+            blocks.append({'type': 'text', 'items': [{
+                'heading': f"Section {p + 1}",
+                'paragraph': f"<p>Paragraph {p + 1} of lesson {n}, with some text to extract.{link_html}</p>"
+                             f"<ul><li>First point</li><li>Second point</li></ul>"
+            }]})
+        for k in range(images):
+            blocks.append({'type': 'image', 'items': [{'media': {'image': {
+                'originalUrl': f"{base_url}/media/{n}-{k}.png", 'altText': f"Image {n}.{k}"
+            }}}]})
+
+        title = "Introduction" if n == 0 else f"Lesson {n}"
+        entries.append({'id': f"l{n}", 'title': title, 'type': 'blocks', 'items': blocks})
+
+    return {'course': {'title': "Fixture Course", 'lessons': entries}}
+
+
+def create_app(lessons=20, images=5, links=5, latency_ms=0, render_ms=100):
+    """aiohttp app serving the fixture course; every response is delayed by `latency_ms`"""
+
+    @web.middleware
+    async def latency(request, handler):
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return await handler(request)
+
+    async def share_page(request):
+        return web.Response(text=SHARE_PAGE, content_type='text/html')
+
+    async def course_page(request):
+        return web.Response(text=COURSE_PAGE % {'render_ms': render_ms}, content_type='text/html')
+
+    async def course_data(request):
+        base_url = f"{request.scheme}://{request.host}"
+        return web.json_response(synthetic_course(base_url, lessons, images=images, links=links))
+
+    async def media(request):
+        return web.Response(body=PIXEL_PNG, content_type='image/png')
+
+    app = web.Application(middlewares=[latency])
+    app.router.add_get('/share/{course}', share_page)
+    app.router.add_get('/course/index.html', course_page)
+    app.router.add_get('/api/course.json', course_data)
+    app.router.add_get('/media/{name}', media)
+    return app
+
+
+async def start_fixture(port=0, **options):
+    """Start the fixture server; returns (runner, course URL)"""
+    runner = web.AppRunner(create_app(**options))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/share/fixture"
+
+
+def process_tree_rss(root_pid):
+    """Resident memory in bytes of a process and all its descendants (from /proc)"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name can contain spaces, so split after its closing parenthesis
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+async def sample_peak_memory(peak, interval=0.1):
+    """Keep peak['rss'] at the highest process tree RSS seen until cancelled"""
+    while True:
+        peak['rss'] = max(peak['rss'], process_tree_rss(os.getpid()))
+        await asyncio.sleep(interval)
+
+
+async def benchmark_run(course_url, concurrency, extraction, dom_quiet_ms):
+    """Crawl the fixture once and measure it"""
+    output_dir = tempfile.mkdtemp(prefix="nmo-bench-")
+    timeouts = ReadinessTimeouts(dom_quiet=dom_quiet_ms)
+    peak = {'rss': 0}
+    sampler = asyncio.ensure_future(sample_peak_memory(peak))
+
+    started = time.perf_counter()
+    try:
+        with PlaywrightCallCounter() as counter:
+            async with Rise360Crawler(course_url, output_dir, headless=True, concurrency=concurrency,
+                                      timeouts=timeouts, extraction=extraction, max_retries=0) as crawler:
+                await crawler.run()
+    finally:
+        sampler.cancel()
+    wall = time.perf_counter() - started
+
+    lessons = sum(1 for entry in crawler.journal.lessons.values() if entry['state'] == 'done')
+    return {
+        'concurrency': concurrency, 'extraction': extraction, 'lessons': lessons,
+        'failed': len(crawler.failed_lessons), 'wall': wall,
+        'per_lesson': wall / lessons if lessons else 0,
+        'round_trips': counter.total, 'peak_rss': peak['rss'],
+    }
+
+
+async def run_benchmark(args):
+    runner, course_url = await start_fixture(
+        lessons=args.lessons, images=args.images, links=args.links,
+        latency_ms=args.latency_ms, render_ms=args.render_ms
+    )
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            for extraction in args.extraction:
+                results.append(await benchmark_run(course_url, concurrency, extraction, args.dom_quiet_ms))
+    finally:
+        await runner.cleanup()
+
+    print(f"Fixture: {args.lessons} lessons, {args.images} images and {args.links} links each, "
+          f"{args.latency_ms} ms latency, {args.render_ms} ms render")
+    print(f"{'concurrency':>11} {'extraction':>11} {'lessons':>8} {'failed':>7} {'wall s':>8} "
+          f"{'s/lesson':>9} {'round trips':>12} {'peak MB':>8}")
+    for r in results:
+        print(f"{r['concurrency']:>11} {r['extraction']:>11} {r['lessons']:>8} {r['failed']:>7} "
+              f"{r['wall']:>8.2f} {r['per_lesson']:>9.3f} {r['round_trips']:>12} {r['peak_rss'] / 2**20:>8.0f}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+async def serve(args):
+    runner, course_url = await start_fixture(
+        port=args.port, lessons=args.lessons, images=args.images, links=args.links,
+        latency_ms=args.latency_ms, render_ms=args.render_ms
+    )
+    print(f"Fixture course at {course_url} (Ctrl+C to stop)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline Rise-like course server and crawler benchmark.")
+    parser.add_argument("--serve", action="store_true", help="Only serve the fixture course.")
+    parser.add_argument("--benchmark", action="store_true", help="Crawl the fixture and report timings.")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --serve.")
+    parser.add_argument("--lessons", type=int, default=20)
+    parser.add_argument("--images", type=int, default=5, help="Images per lesson.")
+    parser.add_argument("--links", type=int, default=5, help="External links per lesson.")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Delay added to every server response.")
+    parser.add_argument("--render-ms", type=int, default=100, help="In-page delay before a lesson renders.")
+    parser.add_argument("--concurrency", type=int, nargs='+', default=[1], help="Concurrency values to compare.")
+    parser.add_argument("--extraction", nargs='+', default=['script'], choices=['script', 'per-element', 'network'])
+    parser.add_argument("--dom-quiet-ms", type=int, default=500)
+    parser.add_argument("--json", help="Also write the benchmark results to this file.")
+    args = parser.parse_args()
+
+    if args.serve:
+        asyncio.run(serve(args))
+    elif args.benchmark:
+        logging.getLogger().setLevel(logging.WARNING)
+        asyncio.run(run_benchmark(args))
+    else:
+        parser.print_help()
@@ -0,0 +1,55 @@
+"""Record a crawl's network traffic to HAR archives and replay it offline
+
+In record mode every page the crawler opens saves its traffic to its own
+archive (`page_<n>.zip` in the HAR directory, response bodies attached),
+written when the page closes. In replay mode every page is served from
+all archives in the directory; requests found in none of them are
+aborted, so a replayed crawl never touches the network and sees the
+same responses every time.
+
+Replay with the same --block profile the recording was made with, or the
+requests it blocked will be aborted as missing instead.
+"""
+
+import logging
+from pathlib import Path
+
+
+class HarArchive:
+    """HAR archives of one course in `har_dir`, in 'record' or 'replay' mode"""
+
+    def __init__(self, har_dir, mode):
+        self.har_dir = Path(har_dir)
+        self.mode = mode
+        self.pages = 0
+        if mode == 'record':
+            self.har_dir.mkdir(parents=True, exist_ok=True)
+            # A recording replaces the previous one
+            for old in self.har_dir.glob('page_*.zip'):
+                old.unlink()
+        else:
+            self.archives = sorted(self.har_dir.glob('page_*.zip'))
+            if not self.archives:
+                raise Exception(f"No HAR archives to replay in {self.har_dir}")
+            logging.info(f"Replaying {len(self.archives)} HAR archives from {self.har_dir}")
+
+    async def block_network(self, page):
+        """In replay mode, abort whatever the archives don't answer.
+
+        Call before any other route is added: Playwright tries the most
+        recently added route first, so this one only sees what the others
+        passed on.
+        """
+        if self.mode == 'replay':
+            await page.route('**/*', lambda route: route.abort('internetdisconnected'))
+
+    async def attach(self, page):
+        """Record the page's traffic, or serve it from the archives"""
+        if self.mode == 'record':
+            path = self.har_dir / f"page_{self.pages}.zip"
+            self.pages += 1
+            await page.route_from_har(path, update=True, update_content='attach', update_mode='full')
+            return
+
+        for path in self.archives:
+            await page.route_from_har(path, not_found='fallback')
@@ -0,0 +1,75 @@
+"""Crash-safe record of which lessons a crawl has finished
+
+`<output_dir>/crawl_journal.json` holds every lesson's state ('pending',
+'done' or 'failed'), attempt count and last error. It is rewritten
+atomically (temp file + rename) on every change, so after a crash or a
+killed run it shows exactly which lessons are finished, and a run with
+--resume skips those.
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+JOURNAL_FILENAME = "crawl_journal.json"
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class CrawlJournal:
+    def __init__(self, output_dir, course_url, resume=False):
+        self.output_dir = output_dir
+        self.path = Path(output_dir) / JOURNAL_FILENAME
+        self.course_url = course_url
+        self.lessons = {}
+
+        if resume and self.path.exists():
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            if data.get('course_url') == course_url:
+                self.lessons = data['lessons']
+                done = sum(1 for entry in self.lessons.values() if entry['state'] == DONE)
+                logging.info(f"Resuming: {done} of {len(self.lessons)} lessons already done")
+            else:
+                logging.warning(f"{self.path} is for another course; starting over")
+
+    def _key(self, filepath):
+        return Path(os.path.relpath(filepath, self.output_dir)).as_posix()
+
+    def plan(self, lessons):
+        """Add every (output file, title) of the course that the journal doesn't know yet as pending"""
+        for filepath, title in lessons:
+            self.lessons.setdefault(self._key(filepath),
+                                    {'title': title, 'state': PENDING, 'attempts': 0, 'error': None})
+        self.save()
+
+    def is_done(self, filepath):
+        entry = self.lessons.get(self._key(filepath))
+        return entry is not None and entry['state'] == DONE
+
+    def start(self, filepath, title):
+        entry = self.lessons.setdefault(self._key(filepath),
+                                        {'title': title, 'state': PENDING, 'attempts': 0, 'error': None})
+        entry['attempts'] += 1
+        entry['started_at'] = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+        self.save()
+
+    def mark_done(self, filepath):
+        self.lessons[self._key(filepath)].update(state=DONE, error=None)
+        self.save()
+
+    def mark_failed(self, filepath, error):
+        self.lessons[self._key(filepath)].update(state=FAILED, error=str(error))
+        self.save()
+
+    def failed_titles(self):
+        return [entry['title'] for entry in self.lessons.values() if entry['state'] == FAILED]
+
+    def save(self):
+        temp_path = self.path.with_suffix('.tmp')
+        data = {'course_url': self.course_url, 'lessons': self.lessons}
+        temp_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+        os.replace(temp_path, self.path)
@@ -0,0 +1,94 @@
+"""Crawl manifest for incremental re-crawls
+
+Remembers a content hash and the last-crawled time of every lesson file in
+`<output_dir>/crawl_manifest.json`, plus the hash of the lesson's entry in
+the course payload when the payload was recognized. On the next crawl, a
+lesson whose payload entry hashes to the same value is not opened at all;
+otherwise it is opened, and if its extracted content hashes to the same
+value it is not rendered or rewritten.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+MANIFEST_FILENAME = "crawl_manifest.json"
+
+
+def content_fingerprint(content):
+    """Stable hash of a lesson's extracted content"""
+    data = json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+class CrawlManifest:
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = Path(output_dir) / MANIFEST_FILENAME
+        self.lessons = {}
+        if self.path.exists():
+            self.lessons = json.loads(self.path.read_text(encoding='utf-8')).get('lessons', {})
+
+        self.added = []
+        self.changed = []
+        self.unchanged = []
+
+    def _key(self, filepath):
+        return Path(os.path.relpath(filepath, self.output_dir)).as_posix()
+
+    def is_unchanged(self, filepath, fingerprint):
+        """True if the lesson was crawled before with the same content and its file still exists"""
+        entry = self.lessons.get(self._key(filepath))
+        return entry is not None and entry['hash'] == fingerprint and Path(filepath).exists()
+
+    def is_source_unchanged(self, filepath, source_fingerprint):
+        """True if the lesson's course payload entry is the same as when it was written"""
+        entry = self.lessons.get(self._key(filepath))
+        return (source_fingerprint is not None and entry is not None
+                and entry.get('source_hash') == source_fingerprint and Path(filepath).exists())
+
+    def mark_unchanged(self, filepath, title, source_fingerprint=None):
+        """Count an unchanged lesson; remember its payload hash if it didn't have one yet"""
+        self.unchanged.append(title)
+        if source_fingerprint is not None:
+            self.lessons[self._key(filepath)]['source_hash'] = source_fingerprint
+
+    def record(self, filepath, title, fingerprint, source_fingerprint=None):
+        """Remember a lesson that was just written"""
+        key = self._key(filepath)
+        (self.changed if key in self.lessons else self.added).append(title)
+        self.lessons[key] = {
+            'title': title,
+            'hash': fingerprint,
+            'crawled_at': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+        }
+        if source_fingerprint is not None:
+            self.lessons[key]['source_hash'] = source_fingerprint
+
+    def save(self, expected_files):
+        """Write the manifest, dropping lessons that are no longer in the course
+
+        Returns the titles of the removed lessons.
+        """
+        expected = {self._key(f) for f in expected_files}
+        removed = [entry['title'] for key, entry in self.lessons.items() if key not in expected]
+        self.lessons = {key: entry for key, entry in self.lessons.items() if key in expected}
+
+        temp_path = self.path.with_suffix('.tmp')
+        temp_path.write_text(json.dumps({'lessons': self.lessons}, indent=2, ensure_ascii=False), encoding='utf-8')
+        os.replace(temp_path, self.path)
+        return removed
+
+    def log_report(self, removed):
+        logging.info("\n" + "="*60)
+        logging.info("INCREMENTAL CRAWL REPORT")
+        logging.info("="*60)
+        logging.info(f"Added: {len(self.added)}  Changed: {len(self.changed)}  "
+                     f"Unchanged: {len(self.unchanged)}  Removed: {len(removed)}")
+        for label, titles in [("Added", self.added), ("Changed", self.changed), ("Removed", removed)]:
+            for title in titles:
+                logging.info(f"  {label}: {title}")
+        logging.info("="*60 + "\n")
@@ -0,0 +1,236 @@
+"""Network-capture extraction: read lessons from Rise's course data payload
+
+Rise 360 shares download the whole course as JSON and render it in the
+browser. CoursePayloadCapture listens to the page's responses while the
+course loads, finds the lesson list in that JSON and turns every lesson's
+blocks into the same content dict the DOM extractors return ('text',
+'html', 'images', 'videos', 'links'), so no lesson has to be clicked.
+
+Check what a saved payload parses to:
+    python src/crawl_network.py --payload course.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import re
+from urllib.parse import unquote
+
+from bs4 import BeautifulSoup
+
+# Block fields that hold (HTML) text, in the order they usually appear
+TEXT_FIELDS = {'heading', 'title', 'paragraph', 'description', 'caption', 'front', 'back', 'text', 'feedback'}
+
+# Media dicts under these keys hold a URL
+MEDIA_FIELDS = {'image', 'video', 'audio', 'embed'}
+
+# Sidebar links point at lessons by id
+LESSON_HREF = re.compile(r'#/lessons/([^/?#]+)')
+
+# Elements after which inner_text would start a new line
+BLOCK_TAGS = ['p', 'div', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'tr']
+
+
+def normalize_title(title):
+    return ' '.join(str(title).split())
+
+
+def find_lessons(data):
+    """Find the course's lesson list anywhere in a JSON document
+
+    A lesson list is a list of dicts that all have a 'title' and a 'type',
+    where at least one of them has an 'items' list (its blocks). Returns
+    None if there is no such list.
+    """
+    if isinstance(data, list):
+        if data and all(isinstance(x, dict) and 'title' in x and 'type' in x for x in data) \
+                and any(isinstance(x.get('items'), list) for x in data):
+            return data
+        children = data
+    elif isinstance(data, dict):
+        children = data.values()
+    else:
+        return None
+
+    for child in children:
+        lessons = find_lessons(child)
+        if lessons is not None:
+            return lessons
+    return None
+
+
+def _media_url(media):
+    for key in ('originalUrl', 'src', 'url'):
+        if isinstance(media.get(key), str) and media[key].startswith('http'):
+            return media[key]
+    return None
+
+
+def _add_html(html, key, content, seen_links):
+    # Block headings and titles are plain text in the payload; mark them up as headings
+    tag = 'h2' if key in ('heading', 'title') else 'div'
+    content['html'] += f"<{tag}>{html}</{tag}>\n"
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for link in soup.select("a[href^='http']"):
+        href = link.get('href')
+        text = link.get_text().strip()
+        if href and href not in seen_links and text:
+            seen_links.add(href)
+            content['links'].append({'url': href, 'text': text})
+
+    for br in soup.find_all('br'):
+        br.replace_with('\n')
+    for element in soup.find_all(BLOCK_TAGS):
+        element.append('\n')
+    lines = [line.strip() for line in soup.get_text().splitlines()]
+    text = '\n'.join(line for line in lines if line)
+    if text:
+        content['text'] += text + '\n\n'
+
+
+def _add_media(kind, media, content, seen_images):
+    url = _media_url(media)
+    if not url:
+        return
+    if kind == 'image':
+        if url not in seen_images and 'logo' not in url.lower():
+            seen_images.add(url)
+            content['images'].append({
+                'src': url,
+                'alt': media.get('altText') or media.get('alt') or '',
+                'title': ''
+            })
+    elif kind == 'embed':
+        if 'googletagmanager' not in url:
+            content['videos'].append({'type': 'iframe', 'url': url})
+    else:
+        content['videos'].append({'type': 'video', 'url': url})
+
+
+def parse_lesson(lesson):
+    """Turn a payload lesson's blocks into a content dict"""
+    content = {'text': '', 'html': '', 'images': [], 'videos': [], 'links': []}
+    seen_images = set()
+    seen_links = set()
+
+    def walk(node, key):
+        if isinstance(node, dict):
+            if key in MEDIA_FIELDS:
+                _add_media(key, node, content, seen_images)
+            for child_key, child in node.items():
+                walk(child, child_key)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child, key)
+        elif isinstance(node, str) and key in TEXT_FIELDS and node.strip():
+            _add_html(node, key, content, seen_links)
+
+    walk(lesson.get('items') or [], None)
+    content['text'] = content['text'].strip()
+    return content
+
+
+class CoursePayload:
+    """Content of every lesson in the payload, looked up by lesson id or title
+
+    Titles repeat across modules ("Summary", "Knowledge Check"), so a lesson
+    is matched by the id in its sidebar href (#/lessons/<id>), and by title
+    only when no other lesson has that title. Anything else is left to the
+    DOM extractors.
+    """
+
+    def __init__(self, lessons):
+        # (id, title, content) per lesson, in course order, and the raw payload entries
+        self.lessons = [(lesson.get('id'), normalize_title(lesson['title']), parse_lesson(lesson))
+                        for lesson in lessons]
+        self.raw = list(lessons)
+        self.by_id = {str(id): i for i, (id, _, _) in enumerate(self.lessons) if id is not None}
+        titles = {}
+        for i, (_, title, _) in enumerate(self.lessons):
+            titles.setdefault(title, []).append(i)
+        self.by_title = {title: indexes[0] for title, indexes in titles.items() if len(indexes) == 1}
+        self.repeated_titles = {title for title, indexes in titles.items() if len(indexes) > 1}
+
+    def __len__(self):
+        return len(self.lessons)
+
+    def _index(self, lesson):
+        match = LESSON_HREF.search(lesson.get('href') or '')
+        if match and unquote(match.group(1)) in self.by_id:
+            return self.by_id[unquote(match.group(1))]
+        return self.by_title.get(normalize_title(lesson['title']))
+
+    def lookup(self, lesson):
+        """Content for a lesson of the course structure, or None if it isn't found or is ambiguous"""
+        index = self._index(lesson)
+        return self.lessons[index][2] if index is not None else None
+
+    def lookup_raw(self, lesson):
+        """The lesson's entry as it is in the payload, or None like lookup()"""
+        index = self._index(lesson)
+        return self.raw[index] if index is not None else None
+
+
+def parse_course_payload(data):
+    """The payload's lessons as a CoursePayload, or None if the payload isn't recognized"""
+    lessons = find_lessons(data)
+    if lessons is None:
+        return None
+    # 'section' entries are the module headings in the sidebar, not lessons
+    return CoursePayload([lesson for lesson in lessons if lesson.get('type') != 'section'])
+
+
+class CoursePayloadCapture:
+    """Collect the course payload from a page's JSON responses"""
+
+    def __init__(self):
+        self.lessons = None
+        self._reads = set()
+
+    def attach(self, page):
+        """Start listening; call before the course is opened"""
+        page.on('response', self._on_response)
+
+    def _on_response(self, response):
+        if 'json' not in response.headers.get('content-type', ''):
+            return
+        task = asyncio.ensure_future(self._read(response))
+        self._reads.add(task)
+        task.add_done_callback(self._reads.discard)
+
+    async def _read(self, response):
+        try:
+            data = await response.json()
+        except Exception:
+            # Bodies of redirects and aborted requests can't be read
+            return
+        lessons = parse_course_payload(data)
+        # Keep the biggest lesson list if several responses have one
+        if lessons and len(lessons) > len(self.lessons or ()):
+            logging.info(f"Course payload captured from {response.url} ({len(lessons)} lessons)")
+            self.lessons = lessons
+
+    async def wait(self):
+        """Wait for responses that are still being read; returns the lessons or None"""
+        if self._reads:
+            await asyncio.gather(*self._reads, return_exceptions=True)
+        return self.lessons
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show what a saved Rise course payload parses to.")
+    parser.add_argument("--payload", required=True, help="JSON file saved from the course's network traffic.")
+    args = parser.parse_args()
+
+    with open(args.payload, encoding='utf-8') as f:
+        lessons = parse_course_payload(json.load(f))
+
+    if lessons is None:
+        print("Payload not recognized: no lesson list found")
+    else:
+        for id, title, content in lessons.lessons:
+            print(f"[{id}] {title}: {len(content['text'])} chars, {len(content['images'])} images, "
+                  f"{len(content['videos'])} videos, {len(content['links'])} links")
@@ -0,0 +1,138 @@
+"""Crawl pipeline: browser stages feed render and write stages through bounded queues
+
+The browser workers only navigate and extract. Each extracted lesson is
+put on a bounded queue for the render stage (unchanged check, asset
+downloads, HTML conversion, markdown), whose output is queued for the
+write stage (atomic file writes in a thread). A page moves on to its next
+lesson as soon as the extracted lesson is queued; if rendering or writing
+falls behind, the full queue makes the browser wait instead of piling up
+lessons in memory.
+
+Every stage keeps throughput and queue-depth stats, logged at the end.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+
+
+def write_text_atomic(path, text):
+    """Write a file so readers see the old or the new content, never half of it"""
+    temp_path = Path(f"{path}.tmp")
+    temp_path.write_text(text, encoding='utf-8')
+    os.replace(temp_path, path)
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.failed = 0
+        self.busy = 0.0
+        # Queue depth seen by each item put on the stage's queue
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.max_depth = 0
+        # Time producers spent waiting because the queue was full
+        self.blocked = 0.0
+
+    def record(self, seconds, failed=False):
+        self.items += 1
+        self.failed += failed
+        self.busy += seconds
+
+    def sample_depth(self, depth):
+        self.depth_total += depth
+        self.depth_samples += 1
+        self.max_depth = max(self.max_depth, depth)
+
+    def summary(self, wall):
+        line = (f"{self.name:9} {self.items:4} items ({self.failed} failed)  "
+                f"{self.items / wall if wall else 0:6.2f}/s  busy {self.busy:7.1f}s")
+        if self.depth_samples:
+            line += (f"  queue avg {self.depth_total / self.depth_samples:4.1f} max {self.max_depth:3}"
+                     f"  producers blocked {self.blocked:6.1f}s")
+        return line
+
+
+class LessonPipeline:
+    """Queued stages after extraction
+
+    `stages` is a list of (name, handler, workers). A handler takes an item
+    and returns the item for the next stage, or None to stop there. If a
+    handler raises, `on_error(item, exception)` is called and the item is
+    dropped.
+    """
+
+    def __init__(self, stages, on_error, maxsize=8, producer_stages=('navigate', 'extract')):
+        self.stages = stages
+        self.on_error = on_error
+        self.queues = [asyncio.Queue(maxsize) for _ in stages]
+        self.stats = {name: StageStats(name) for name in producer_stages}
+        self.stats.update({name: StageStats(name) for name, _, _ in stages})
+        self.workers = []
+        self.started = None
+
+    def start(self):
+        self.started = time.monotonic()
+        for index, (name, handler, workers) in enumerate(self.stages):
+            for _ in range(workers):
+                self.workers.append(asyncio.ensure_future(self._work(index)))
+
+    def record(self, stage, seconds, failed=False):
+        """Time spent in a stage that runs outside the pipeline (the browser stages)"""
+        self.stats[stage].record(seconds, failed)
+
+    async def submit(self, item):
+        """Queue an extracted lesson; waits while the first queue is full"""
+        await self._put(0, item)
+
+    async def _put(self, index, item):
+        queue = self.queues[index]
+        stats = self.stats[self.stages[index][0]]
+        stats.sample_depth(queue.qsize())
+        started = time.monotonic()
+        await queue.put(item)
+        stats.blocked += time.monotonic() - started
+
+    async def _work(self, index):
+        name, handler, _ = self.stages[index]
+        queue = self.queues[index]
+        while True:
+            item = await queue.get()
+            started = time.monotonic()
+            try:
+                result = await handler(item)
+            except Exception as e:
+                self.stats[name].record(time.monotonic() - started, failed=True)
+                self.on_error(item, e)
+                result = None
+            else:
+                self.stats[name].record(time.monotonic() - started)
+            try:
+                if result is not None and index + 1 < len(self.stages):
+                    await self._put(index + 1, result)
+            finally:
+                queue.task_done()
+
+    async def join(self):
+        """Wait until every queued item went through all stages"""
+        for queue in self.queues:
+            await queue.join()
+
+    async def close(self):
+        await self.join()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+
+    def log_stats(self):
+        wall = time.monotonic() - self.started if self.started else 0
+        logging.info("\n" + "="*60)
+        logging.info(f"PIPELINE STATS ({wall:.1f}s)")
+        logging.info("="*60)
+        for stats in self.stats.values():
+            logging.info(stats.summary(wall))
+        logging.info("="*60 + "\n")
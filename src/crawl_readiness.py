@@ -0,0 +1,132 @@
+"""Event-driven waits that tell the crawler when a Rise 360 page is ready"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from playwright._impl._errors import TimeoutError as PlaywrightTimeoutError
+
+# Elements that only exist inside the Rise course frame
+COURSE_FRAME_SELECTOR = "[class*='lesson']"
+
+# Any of these means the lesson body has been rendered
+LESSON_CONTENT_SELECTOR = "main, article, [role='main'], [class*='lesson__content']"
+
+START_BUTTON_SELECTOR = "button:has-text('START COURSE'), button:has-text('Start Course')"
+
+# How often to look for the start button / course frame while the course loads
+POLL_INTERVAL = 0.25
+
+# Identifies which lesson is showing: the URL (Rise routes lessons by hash)
+# plus the text of the active sidebar item
+NAV_STATE_SCRIPT = """() => {
+    const active = document.querySelector(
+        "nav a[aria-current], nav a[class*='active'], nav [class*='active'] a"
+    );
+    return location.href + '|' + (active ? active.textContent.trim() : '');
+}"""
+
+# True once the nav state differs from `previous`, or the URL already
+# points at the clicked link
+NAV_CHANGED_SCRIPT = """([previous, href]) => {
+    const active = document.querySelector(
+        "nav a[aria-current], nav a[class*='active'], nav [class*='active'] a"
+    );
+    const state = location.href + '|' + (active ? active.textContent.trim() : '');
+    return state !== previous || (!!href && !!location.hash && href.endsWith(location.hash));
+}"""
+
+# Resolves once the DOM has had no mutations for `quietMs` (true), or after
+# `maxMs` regardless (false)
+DOM_QUIET_SCRIPT = """([quietMs, maxMs]) => new Promise(resolve => {
+    let quietTimer = null;
+    let capTimer = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done(true), quietMs);
+    });
+    const done = settled => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(capTimer);
+        resolve(settled);
+    };
+    observer.observe(document.body || document.documentElement, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+    quietTimer = setTimeout(() => done(true), quietMs);
+    capTimer = setTimeout(() => done(false), maxMs);
+})"""
+
+
+@dataclass
+class ReadinessTimeouts:
+    """Timeouts (milliseconds) for the readiness waits"""
+    page_load: int = 60000       # Initial page.goto
+    course_frame: int = 30000    # Course frame (and START COURSE button) appearing
+    nav_change: int = 10000      # Sidebar/URL switching to the clicked lesson
+    lesson_content: int = 15000  # Lesson content element appearing
+    dom_quiet: int = 500         # DOM must be free of mutations this long...
+    dom_settle: int = 10000      # ...but stop waiting for that after this long
+
+
+async def find_course_frame(page):
+    """Return the frame holding the course, or None if it isn't there (yet)"""
+    for frame in page.frames:
+        if frame.url in ["about:blank", ""] or "googletagmanager" in frame.url:
+            continue
+        try:
+            if await frame.locator(COURSE_FRAME_SELECTOR).count() > 0:
+                return frame
+        except Exception:
+            # Frames can detach while we look at them
+            continue
+    return None
+
+
+async def wait_for_course_frame(page, timeouts: ReadinessTimeouts):
+    """Wait for the course frame, clicking START COURSE if it shows up first"""
+    deadline = time.monotonic() + timeouts.course_frame / 1000
+    start_button = page.locator(START_BUTTON_SELECTOR)
+    start_clicked = False
+
+    while time.monotonic() < deadline:
+        frame = await find_course_frame(page)
+        if frame is not None:
+            return frame
+
+        if not start_clicked and await start_button.count() > 0:
+            logging.info("'START COURSE' button found. Clicking it.")
+            await start_button.first.click()
+            start_clicked = True
+
+        await asyncio.sleep(POLL_INTERVAL)
+
+    raise Exception("Fatal: Could not find course content frame.")
+
+
+async def nav_state(frame):
+    """Snapshot of which lesson is showing, to detect when a click took effect"""
+    return await frame.evaluate(NAV_STATE_SCRIPT)
+
+
+async def wait_for_lesson_ready(frame, previous_state, href, timeouts: ReadinessTimeouts):
+    """Wait until a clicked lesson is showing and its DOM has settled
+
+    1. The URL / active sidebar item changes from `previous_state`
+    2. The lesson content element is in the DOM
+    3. No DOM mutations for `dom_quiet` ms
+    """
+    try:
+        await frame.wait_for_function(
+            NAV_CHANGED_SCRIPT, arg=[previous_state, href or ""], timeout=timeouts.nav_change
+        )
+    except PlaywrightTimeoutError:
+        logging.debug("Navigation state did not change; continuing")
+
+    await frame.wait_for_selector(LESSON_CONTENT_SELECTOR, state="attached", timeout=timeouts.lesson_content)
+
+    settled = await frame.evaluate(DOM_QUIET_SCRIPT, [timeouts.dom_quiet, timeouts.dom_settle])
+    if not settled:
+        logging.debug(f"DOM still changing after {timeouts.dom_settle} ms; extracting anyway")
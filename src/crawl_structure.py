@@ -0,0 +1,83 @@
+"""Discover a Rise 360 course's modules and lessons from its sidebar
+
+One script lists every sidebar link with its index among `nav a`, its href
+and the title of the section it sits in. Sections become modules; lessons
+before the first section are the introduction (the first one) and, if
+there are more, a module of their own.
+"""
+
+import logging
+
+# For every `nav a`: its index (matches frame.locator('nav a').nth(index)),
+# title, href and section title. A section is either the list item that
+# contains the lesson's list, or the closest earlier sibling without links.
+SIDEBAR_SCRIPT = """() => ({
+    title: document.title,
+    items: Array.from(document.querySelectorAll('nav a')).map((a, index) => {
+        const text = el => (el.innerText || el.textContent || '').trim();
+        let section = '';
+        const item = a.closest('li');
+        const group = item && item.parentElement ? item.parentElement.closest('li') : null;
+        if (group) {
+            const heading = group.querySelector(':scope > :not(ol):not(ul)');
+            if (heading && !heading.contains(a)) section = text(heading);
+        } else if (item) {
+            for (let prev = item.previousElementSibling; prev; prev = prev.previousElementSibling) {
+                if (!prev.querySelector('a')) {
+                    section = text(prev);
+                    break;
+                }
+            }
+        }
+        return {index: index, title: text(a), href: a.getAttribute('href') || '', section: section};
+    })
+})"""
+
+
+def build_course_structure(course_title, items):
+    """Turn the sidebar items into the crawler's course structure dict"""
+    lessons = []
+    seen = set()
+    for item in items:
+        key = item['href'] or item['title']
+        # The sidebar can list a lesson twice (e.g. a "continue" link)
+        if not item['title'] or key in seen:
+            continue
+        seen.add(key)
+        lessons.append(item)
+
+    if not lessons:
+        raise Exception("Fatal: No lessons found in the course navigation.")
+
+    def lesson_entry(item):
+        return {"title": item['title'], "nav_index": item['index'], "href": item['href']}
+
+    introduction = lesson_entry(lessons[0])
+    modules = []
+    for item in lessons[1:]:
+        module_title = item['section'] or "Lessons"
+        if not modules or modules[-1]['module_title'] != module_title:
+            modules.append({
+                "module_number": len(modules) + 1,
+                "module_title": module_title,
+                "lessons": []
+            })
+        modules[-1]['lessons'].append(lesson_entry(item))
+
+    return {
+        "course_title": course_title,
+        "introduction": introduction,
+        "modules": modules
+    }
+
+
+async def discover_course_structure(frame, timeout=30000):
+    """Read the course structure from the sidebar in one round trip"""
+    # The course frame can show up before its sidebar has been filled in
+    await frame.wait_for_selector("nav a", state="attached", timeout=timeout)
+    sidebar = await frame.evaluate(SIDEBAR_SCRIPT)
+    structure = build_course_structure(sidebar['title'].strip() or "Rise360 Course", sidebar['items'])
+    duplicates = len(sidebar['items']) - 1 - sum(len(m['lessons']) for m in structure['modules'])
+    if duplicates:
+        logging.info(f"Skipped {duplicates} duplicate or empty nav items")
+    return structure
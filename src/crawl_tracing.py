@@ -0,0 +1,190 @@
+"""Timing spans for crawls
+
+Tracer.span() times one step of the crawl (opening the course, finding
+the frame, discovering the structure, and each lesson's click, wait,
+extract, render and write). It also counts the Playwright calls made
+inside it. Spans go to a JSON lines file as they finish, and
+log_summary() prints a per-lesson table at the end of the crawl.
+
+SlowestLessonTraces records a Playwright trace (screenshots + DOM
+snapshots) for every lesson, but only keeps the slowest N on disk; open
+them with `playwright show-trace <file>`.
+"""
+
+import contextvars
+import heapq
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+# Lesson being crawled by the current task; spans pick it up automatically
+current_lesson = contextvars.ContextVar('current_lesson', default=None)
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+# Columns of the summary table, in crawl order
+LESSON_PHASES = ['click', 'wait', 'extract', 'render', 'write']
+
+
+class PlaywrightCallCounter:
+    """Counts messages sent to the Playwright driver (one per round trip), by method
+
+    `on_call(method)`, if given, is called for every message.
+    """
+
+    def __init__(self, on_call=None):
+        self.calls = Counter()
+        self.on_call = on_call
+        self._original = None
+
+    def __enter__(self):
+        from playwright._impl._connection import Connection
+
+        self._original = Connection._send_message_to_server
+        counter = self
+
+        def counting_send(connection, object, method, *args, **kwargs):
+            counter.calls[method] += 1
+            if counter.on_call:
+                counter.on_call(method)
+            return counter._original(connection, object, method, *args, **kwargs)
+
+        Connection._send_message_to_server = counting_send
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        from playwright._impl._connection import Connection
+
+        Connection._send_message_to_server = self._original
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+
+class Tracer:
+    """Collects spans; does nothing when disabled"""
+
+    def __init__(self, path=None, enabled=True):
+        self.enabled = enabled
+        self.path = path
+        self.spans = []
+        self.origin = time.perf_counter()
+        self._file = None
+        self._counter = None
+
+    def start(self):
+        """Open the JSON lines file and start counting Playwright calls"""
+        if not self.enabled:
+            return
+        if self.path:
+            self._file = open(self.path, 'w', encoding='utf-8')
+        self._counter = PlaywrightCallCounter(on_call=self._count_call).__enter__()
+
+    def close(self):
+        if self._counter:
+            self._counter.__exit__(None, None, None)
+            self._counter = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _count_call(self, method):
+        # Calls are counted in the innermost span of the task that made them
+        span = _current_span.get()
+        if span is not None:
+            span['calls'] += 1
+
+    @contextmanager
+    def span(self, name, lesson=None, **attrs):
+        if not self.enabled:
+            yield None
+            return
+
+        record = {'name': name, 'lesson': lesson or current_lesson.get(), 'calls': 0, **attrs}
+        token = _current_span.set(record)
+        started = time.perf_counter()
+        record['start_s'] = round(started - self.origin, 4)
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = str(e)
+            raise
+        finally:
+            record['ms'] = round((time.perf_counter() - started) * 1000, 1)
+            _current_span.reset(token)
+            self.spans.append(record)
+            if self._file:
+                self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                self._file.flush()
+
+    def log_summary(self):
+        if not self.enabled or not self.spans:
+            return
+
+        lessons = defaultdict(lambda: defaultdict(float))
+        calls = Counter()
+        course_spans = []
+        for span in self.spans:
+            if span['lesson'] is None:
+                course_spans.append(span)
+                continue
+            lessons[span['lesson']][span['name']] += span['ms']
+            calls[span['lesson']] += span['calls']
+
+        logging.info("\n" + "="*60)
+        logging.info("CRAWL TRACE SUMMARY (ms)")
+        logging.info("="*60)
+        for span in course_spans:
+            logging.info(f"{span['name']:24} {span['ms']:9.1f}  {span['calls']:5} calls")
+
+        header = ''.join(f"{phase:>9}" for phase in LESSON_PHASES)
+        logging.info(f"{'lesson':30}{header}{'total':>10}{'calls':>7}")
+        totals = defaultdict(float)
+        for title, phases in lessons.items():
+            row = ''.join(f"{phases.get(phase, 0):9.1f}" for phase in LESSON_PHASES)
+            total = sum(phases.values())
+            for phase, ms in phases.items():
+                totals[phase] += ms
+            logging.info(f"{title[:29]:30}{row}{total:10.1f}{calls[title]:7}")
+        row = ''.join(f"{totals.get(phase, 0):9.1f}" for phase in LESSON_PHASES)
+        logging.info(f"{'TOTAL':30}{row}{sum(totals.values()):10.1f}{sum(calls.values()):7}")
+        if self._counter:
+            logging.info(f"Playwright calls: {self._counter.total} "
+                         f"({', '.join(f'{m} {n}' for m, n in self._counter.calls.most_common(5))})")
+        logging.info("="*60 + "\n")
+
+
+class SlowestLessonTraces:
+    """Playwright traces of the `keep` slowest lessons, saved in `trace_dir`"""
+
+    def __init__(self, trace_dir, keep):
+        self.trace_dir = Path(trace_dir)
+        self.trace_dir.mkdir(parents=True, exist_ok=True)
+        self.keep = keep
+        self._kept = []  # min-heap of (ms, path)
+        self._started_contexts = set()
+        self._counter = 0
+
+    async def begin(self, page, title):
+        context = page.context
+        if context not in self._started_contexts:
+            await context.tracing.start(screenshots=True, snapshots=True)
+            self._started_contexts.add(context)
+        await context.tracing.start_chunk(title=title)
+
+    async def end(self, page, title, ms):
+        """Finish the lesson's trace chunk; keep it only if it is among the slowest"""
+        self._counter += 1
+        name = re.sub(r'[^A-Za-z0-9]+', '_', title).strip('_')[:60]
+        path = self.trace_dir / f"{int(ms):07d}ms_{self._counter:03d}_{name}.zip"
+        await page.context.tracing.stop_chunk(path=str(path))
+
+        heapq.heappush(self._kept, (ms, str(path)))
+        if len(self._kept) > self.keep:
+            _, fastest = heapq.heappop(self._kept)
+            os.remove(fastest)
@@ -2,196 +2,247 @@ import asyncio
 import logging
 import os
 import json
+import time
 from pathlib import Path
+from urllib.parse import urljoin
 from playwright.async_api import async_playwright
-from playwright._impl._errors import TimeoutError as PlaywrightTimeoutError
+
+from crawl_assets import AssetDownloader
+from crawl_blocking import DEFAULT_PROFILE, apply_profile, format_stats
+from crawl_convert import MarkdownConverter, save_cached_lesson
+from crawl_extract import extract_lesson_payload
+from crawl_har import HarArchive
+from crawl_journal import CrawlJournal
+from crawl_manifest import CrawlManifest, content_fingerprint
+from crawl_network import CoursePayloadCapture
+from crawl_pipeline import LessonPipeline, write_text_atomic
+from crawl_readiness import ReadinessTimeouts, nav_state, wait_for_course_frame, wait_for_lesson_ready
+from crawl_structure import discover_course_structure
+from crawl_tracing import SlowestLessonTraces, Tracer, current_lesson
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class Rise360Crawler:
-    def __init__(self, course_url: str, output_dir: str = "output", headless: bool = False):
+    def __init__(self, course_url: str, output_dir: str = "output", headless: bool = False,
+                 concurrency: int = 1, timeouts: ReadinessTimeouts = None, extraction: str = 'script',
+                 incremental: bool = False, block_profile: str = DEFAULT_PROFILE,
+                 download_assets: bool = False, browser=None, page_slots: asyncio.Semaphore = None,
+                 resume: bool = False, max_retries: int = 2, retry_backoff: float = 5.0,
+                 convert_workers: int = 2, queue_size: int = 8, trace: bool = False,
+                 trace_slowest: int = 0, har_dir: str = None, har_mode: str = None):
         self.course_url = course_url
         self.output_dir = output_dir
         self.headless = headless
+        # Number of lessons crawled at the same time, each on its own page
+        self.concurrency = max(1, concurrency)
+        self.timeouts = timeouts or ReadinessTimeouts()
+        # 'script': one in-page script per lesson; 'per-element': one Playwright call per attribute;
+        # 'network': read every lesson from the course payload, falling back to 'script'
+        self.extraction = extraction
+        # Skip rewriting lessons whose content hash matches the last crawl
+        self.manifest = CrawlManifest(output_dir) if incremental else None
+        # The course payload is also read in incremental mode: lessons whose payload
+        # is unchanged since the last crawl are skipped without being opened
+        self.payload_capture = CoursePayloadCapture() if extraction == 'network' or incremental else None
+        # Lesson content by id or title (a CoursePayload), when the course payload was recognized
+        self.course_payload = None
+        # Which requests to abort (see crawl_blocking.py), and what each page / lesson loaded
+        self.block_profile = block_profile
+        self.page_stats = {}
+        self.lesson_stats = {}
+        # Save images and videos next to the markdown instead of hotlinking them
+        self.download_assets = download_assets
+        self.asset_downloader = None
+        # Processes turning lesson HTML into structured markdown (0: plain text only)
+        self.convert_workers = convert_workers
+        self.converter = None
+        # Render and write stages after extraction (see crawl_pipeline.py)
+        self.queue_size = queue_size
+        self.pipeline = None
         self.playwright = None
-        self.browser = None
+        # A browser passed in is shared with other crawls (see crawl_batch.py): we only
+        # close our own pages, and `page_slots` limits the pages open across all crawls
+        self.browser = browser
+        self.owns_browser = browser is None
+        self.page_slots = page_slots
         self.page = None
         self.course_frame = None
         
-        # Define the exact course structure
-        self.course_structure = {
-            "course_title": "New Missionary Orientation for BYU-Pathway",
-            "introduction": {
-                "title": "Introduction to Serving with BYU-Pathway Worldwide",
-                "nav_index": 0
-            },
-            "modules": [
-                {
-                    "module_number": 1,
-                    "module_title": "Access to Essential Systems",
-                    "lessons": [
-                        {"title": "Access to a Zoom Account", "nav_index": 1},
-                        {"title": "Access the Student Information System", "nav_index": 2},
-                        {"title": "Access to Resources and Ongoing Training Material", "nav_index": 3}
-                    ]
-                },
-                {
-                    "module_number": 2,
-                    "module_title": "Zoom for Virtual Gatherings",
-                    "lessons": [
-                        {"title": "Basic Zoom Skills for Your First Gathering", "nav_index": 4},
-                        {"title": "Download and Install the Zoom App", "nav_index": 5},
-                        {"title": "How to Open Your Zoom Room", "nav_index": 6},
-                        {"title": "Learn Your Zoom Room Tools", "nav_index": 7},
-                        {"title": "How to Update Your Personal Profile", "nav_index": 8},
-                        {"title": "How to Share Your Screen in Zoom", "nav_index": 9},
-                        {"title": "Share Your Zoom Room Link", "nav_index": 10}
-                    ]
-                },
-                {
-                    "module_number": 3,
-                    "module_title": "Contacting Your Students",
-                    "lessons": [
-                        {"title": "Who Are Your Students?", "nav_index": 11},
-                        {"title": "Contact Your Students", "nav_index": 12},
-                        {"title": "Send an Email Message or Group Chat", "nav_index": 13},
-                        {"title": "New Student Visits", "nav_index": 14}
-                    ]
-                },
-                {
-                    "module_number": 4,
-                    "module_title": "Your First Gathering",
-                    "lessons": [
-                        {"title": "Your Role in the First Gathering", "nav_index": 15},
-                        {"title": "Lead and Observing Students", "nav_index": 16},
-                        {"title": "Former PathwayConnect Completer", "nav_index": 17}
-                    ]
-                },
-                {
-                    "module_number": 5,
-                    "module_title": "Learning More About the Student Information System",
-                    "lessons": [
-                        {"title": "My Gatherings Portal and Student Information", "nav_index": 18},
-                        {"title": "Monitor Student Progress", "nav_index": 19},
-                        {"title": "Create Gathering Meeting Outlines", "nav_index": 20}
-                    ]
-                },
-                {
-                    "module_number": 6,
-                    "module_title": "Next Steps in Your Orientation Training",
-                    "lessons": [
-                        {"title": "Missionary Training and Resources", "nav_index": 21},
-                        {"title": "Your Orientation Trainer and Additional Training Resources", "nav_index": 22}
-                    ]
-                }
-            ]
-        }
+        # Discovered from the course sidebar when the crawl starts
+        self.course_structure = None
+        # Every lesson's state on disk; with `resume`, lessons done in an earlier run are skipped
+        self.journal = CrawlJournal(output_dir, course_url, resume=resume)
+        # Lessons that fail are retried at the end, up to `max_retries` rounds with
+        # a backoff of `retry_backoff` seconds, doubling each round
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        # Timing spans (see crawl_tracing.py), written to crawl_trace.jsonl with `trace`,
+        # and Playwright traces of the `trace_slowest` slowest lessons
+        trace_path = os.path.join(output_dir, 'crawl_trace.jsonl') if trace else None
+        self.tracer = Tracer(trace_path, enabled=trace or trace_slowest > 0)
+        self.lesson_traces = (SlowestLessonTraces(os.path.join(output_dir, 'traces'), trace_slowest)
+                              if trace_slowest > 0 else None)
+        # 'record': save every page's traffic to HAR archives in `har_dir`;
+        # 'replay': serve the crawl from them without network (see crawl_har.py)
+        self.har = HarArchive(har_dir, har_mode) if har_mode else None
+        if har_mode == 'replay' and download_assets:
+            logging.warning("Asset downloads bypass the browser; not downloading assets in HAR replay")
+            self.download_assets = False
         
         Path(self.output_dir).mkdir(parents=True, exist_ok=True)
 
     async def __aenter__(self):
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(headless=self.headless)
-        self.page = await self.browser.new_page()
+        self.tracer.start()
+        if self.owns_browser:
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=self.headless)
+        self.page = await self._new_page()
+        if self.payload_capture:
+            self.payload_capture.attach(self.page)
+        if self.download_assets:
+            self.asset_downloader = await AssetDownloader(self.output_dir).__aenter__()
+        if self.convert_workers > 0:
+            self.converter = MarkdownConverter(self.convert_workers)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.browser:
+        if self.asset_downloader:
+            await self.asset_downloader.__aexit__(exc_type, exc_val, exc_tb)
+        if self.converter:
+            self.converter.close()
+        # Closing a page also writes its HAR archive when recording
+        if not self.owns_browser or self.har:
+            for page in self.page_stats:
+                if not page.is_closed():
+                    await page.close()
+        if self.owns_browser and self.browser:
             await self.browser.close()
         if self.playwright:
             await self.playwright.stop()
+        self.tracer.close()
         logging.info("Crawling finished.")
 
     async def run(self):
         try:
             await self._navigate_to_course()
-            await self._verify_structure()
-            await self._crawl_course()
+            await self._discover_structure()
+            self.journal.plan((filepath, title) for title, filepath, _ in self._plan_crawl())
+            self._skip_unchanged_lessons()
+            self.pipeline = self._start_pipeline()
+            try:
+                await self._crawl_course()
+                await self.pipeline.join()
+                await self._retry_unfinished()
+            finally:
+                await self.pipeline.close()
+            self.pipeline.log_stats()
+            self.tracer.log_summary()
             await self._save_course_index()
+            self._log_resource_summary()
+            if self.manifest:
+                removed = self.manifest.save(self._expected_files())
+                self.manifest.log_report(removed)
             
         except Exception as e:
             logging.error(f"An unexpected error occurred: {e}")
-            if self.page:
-                await self.page.screenshot(path='debug_screenshot.png')
+            if self.page and not self.page.is_closed():
+                await self.page.screenshot(path=os.path.join(self.output_dir, 'debug_screenshot.png'))
             raise
 
-    async def _navigate_to_course(self):
-        logging.info(f"Navigating to course URL: {self.course_url}")
-        await self.page.goto(self.course_url, timeout=60000)
-        await asyncio.sleep(10)
+    async def _new_page(self, wait_for_slot=True):
+        """Open a page with the resource blocking profile applied.
+
+        Returns None if `wait_for_slot` is False and every page slot is taken.
+        """
+        if self.page_slots is None:
+            page = await self.browser.new_page()
+        else:
+            # Nothing suspends between locked() and acquire(), so this can't block
+            if not wait_for_slot and self.page_slots.locked():
+                return None
+            await self.page_slots.acquire()
+            try:
+                page = await self.browser.new_page()
+            except Exception:
+                self.page_slots.release()
+                raise
+            page.once('close', lambda _: self.page_slots.release())
+        if self.har:
+            await self.har.block_network(page)
+        self.page_stats[page] = await apply_profile(page, self.block_profile)
+        if self.har:
+            await self.har.attach(page)
+        return page
+
+    async def _navigate_to_course(self, page=None):
+        """Open the course on a page and return its content frame.
+
+        Without a page, the crawler's main page is used and its frame is
+        stored as self.course_frame.
+        """
+        main_page = page is None
+        page = page or self.page
 
-        # Look for START COURSE button
-        try:
-            start_button = self.page.locator("button:has-text('START COURSE'), button:has-text('Start Course')")
-            await start_button.wait_for(timeout=5000)
-            logging.info("'START COURSE' button found. Clicking it.")
-            await start_button.click()
-            await asyncio.sleep(5)
-        except PlaywrightTimeoutError:
-            logging.info("No 'START COURSE' button found.")
-
-        # Find course frame
-        for attempt in range(10):
-            frames = self.page.frames
-            for frame in frames:
-                if frame.url in ["about:blank", ""] or "googletagmanager" in frame.url:
-                    continue
-                try:
-                    html_content = await frame.content()
-                    if len(html_content) > 1000:
-                        lesson_count = await frame.locator("[class*='lesson']").count()
-                        if lesson_count > 0:
-                            self.course_frame = frame
-                            logging.info(f"Found course frame")
-                            return
-                except Exception:
-                    continue
-            await asyncio.sleep(2)
-        
-        raise Exception("Fatal: Could not find course content frame.")
-
-    async def _verify_structure(self):
-        """Verify the navigation matches our expected structure"""
+        logging.info(f"Navigating to course URL: {self.course_url}")
+        with self.tracer.span('navigate_to_course'):
+            await page.goto(self.course_url, timeout=self.timeouts.page_load, wait_until='domcontentloaded')
+
+        # Clicks START COURSE if needed, then waits for the course frame
+        with self.tracer.span('find_course_frame'):
+            frame = await wait_for_course_frame(page, self.timeouts)
+        if main_page:
+            self.course_frame = frame
+        logging.info(f"Found course frame")
+        if page in self.page_stats:
+            logging.info(f"   Course load: {format_stats(self.page_stats[page].snapshot())}")
+
+        if main_page and self.payload_capture:
+            self.course_payload = await self.payload_capture.wait()
+            if self.course_payload is None and self.extraction == 'network':
+                logging.warning("Course payload not recognized; extracting lessons from the page instead")
+            elif self.course_payload is None:
+                logging.warning("Course payload not recognized; every lesson is opened to check for changes")
+        return frame
+
+    async def _discover_structure(self):
+        """Build the module/lesson tree from the course sidebar"""
         logging.info("\n" + "="*60)
-        logging.info("VERIFYING COURSE STRUCTURE")
+        logging.info("DISCOVERING COURSE STRUCTURE")
         logging.info("="*60)
 
-        nav_items = self.course_frame.locator("nav a")
-        actual_count = await nav_items.count()
-
-        expected_count = 1 + sum(len(m['lessons']) for m in self.course_structure['modules'])
+        with self.tracer.span('discover_structure'):
+            self.course_structure = await discover_course_structure(self.course_frame, self.timeouts.course_frame)
 
-        logging.info(f"Expected lessons: {expected_count}")
-        logging.info(f"Found nav items: {actual_count}")
-
-        # List actual navigation items and detect duplicates
-        logging.info("\nActual Navigation Items:")
-        seen_texts = {}
-        for i in range(min(actual_count, 30)):
-            item = nav_items.nth(i)
-            text = await item.inner_text()
-            text = text.strip()
-            logging.info(f"  [{i}] {text}")
-            if text in seen_texts:
-                logging.warning(f"       ^ DUPLICATE of index {seen_texts[text]}")
-            else:
-                seen_texts[text] = i
-
-        if actual_count < expected_count:
-            logging.warning(f"Warning: Found fewer items than expected!")
+        logging.info(f"Course: {self.course_structure['course_title']}")
+        intro = self.course_structure['introduction']
+        logging.info(f"  [{intro['nav_index']}] Introduction: {intro['title']}")
+        for module in self.course_structure['modules']:
+            logging.info(f"  Module {module['module_number']}: {module['module_title']}")
+            for lesson in module['lessons']:
+                logging.info(f"    [{lesson['nav_index']}] {lesson['title']}")
 
+        lesson_count = 1 + sum(len(m['lessons']) for m in self.course_structure['modules'])
+        logging.info(f"Found {len(self.course_structure['modules'])} modules, {lesson_count} lessons")
         logging.info("="*60 + "\n")
 
     async def _crawl_course(self):
         """Crawl the entire course following the defined structure"""
-        
+        # Lessons from the course payload need no page, so extra workers don't help
+        if self.concurrency > 1 and not self._extracts_from_payload():
+            await self._crawl_course_concurrently()
+            return
+
         # 1. Crawl Introduction (standalone)
         logging.info("\n" + "#"*60)
         logging.info("# INTRODUCTION")
         logging.info("#"*60)
         
         intro = self.course_structure['introduction']
-        await self._crawl_introduction(intro)
+        await self._crawl_tracked(
+            intro['title'],
+            self._introduction_filepath(),
+            lambda frame: self._crawl_introduction(intro, frame)
+        )
         
         # 2. Crawl all modules
         for module in self.course_structure['modules']:
@@ -203,122 +254,501 @@ class Rise360Crawler:
             logging.info(f"{'#'*60}")
             
             # Create module directory
-            module_dir = os.path.join(
-                self.output_dir,
-                f"Module_{module_num:02d}_{self._sanitize_filename(module_title)}"
-            )
+            module_dir = self._module_dir(module_num, module_title)
             Path(module_dir).mkdir(parents=True, exist_ok=True)
             
             # Crawl each lesson in the module
             for lesson_idx, lesson in enumerate(module['lessons'], 1):
-                try:
-                    await self._crawl_lesson(
-                        lesson,
-                        lesson_idx,
-                        module_num,
-                        module_title,
-                        module_dir
-                    )
-                except Exception as e:
-                    logging.error(f"Error crawling lesson: {e}")
-                    continue
+                await self._crawl_tracked(
+                    lesson['title'],
+                    self._lesson_filepath(lesson_idx, lesson['title'], module_dir),
+                    lambda frame: self._crawl_lesson(lesson, lesson_idx, module_num, module_title, module_dir, frame)
+                )
 
-    async def _crawl_introduction(self, intro):
-        """Crawl the introduction lesson"""
-        logging.info(f"\nCrawling Introduction: {intro['title']}")
+    def _plan_crawl(self):
+        """List every page of the course as (title, output file, crawl function) in course order.
 
-        # Click by matching the title text exactly
-        title = intro['title']
-        nav_link = self.course_frame.locator(f"nav a:has-text('{title}')").first
+        Each crawl function takes the course frame to work in.
+        """
+        intro = self.course_structure['introduction']
+        jobs = [(intro['title'], self._introduction_filepath(),
+                 lambda frame: self._crawl_introduction(intro, frame))]
 
-        # Verify the link exists
-        link_count = await nav_link.count()
-        if link_count == 0:
-            logging.error(f"Could not find navigation link for: {title}")
-            return
+        for module in self.course_structure['modules']:
+            module_num = module['module_number']
+            module_title = module['module_title']
+            module_dir = self._module_dir(module_num, module_title)
+            Path(module_dir).mkdir(parents=True, exist_ok=True)
 
-        click_text = await nav_link.inner_text()
-        logging.info(f"   Clicking nav item: '{click_text.strip()}'")
+            for lesson_idx, lesson in enumerate(module['lessons'], 1):
+                jobs.append((
+                    lesson['title'],
+                    self._lesson_filepath(lesson_idx, lesson['title'], module_dir),
+                    lambda frame, lesson=lesson, lesson_idx=lesson_idx, module_num=module_num,
+                           module_title=module_title, module_dir=module_dir:
+                        self._crawl_lesson(lesson, lesson_idx, module_num, module_title, module_dir, frame)
+                ))
+
+        return jobs
+
+    async def _crawl_course_concurrently(self):
+        """Crawl lessons in parallel, each worker on its own page and browser context.
+
+        A semaphore keeps at most `concurrency` lessons in flight. Pages that
+        finished a lesson go back to a pool and are reused, so the course is
+        only opened once per worker. A failed lesson closes its page (it may
+        be in a bad state) without affecting the other workers.
+
+        With shared `page_slots`, a worker only opens a page if a slot is
+        free; otherwise it waits for one of this crawl's pages to become
+        idle. It waits for a slot only when the crawl has no page left, so
+        it never blocks holding a lesson while its own pages sit idle
+        (pages release their slots only when the crawl ends).
+        """
+        jobs = self._plan_crawl()
+        logging.info(f"Crawling {len(jobs)} lessons with {self.concurrency} workers")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # The main page already has the course open, so it starts in the pool
+        idle_pages = [(self.page, self.course_frame)]
+        opened_pages = []
+        # The main page after a failed lesson: it keeps its slot, so it is
+        # reopened on the course rather than replaced
+        stale_pages = []
+        # Pages of this crawl that are idle, stale or crawling; notified when one is freed or dropped
+        live_pages = 1
+        pages_changed = asyncio.Condition()
+
+        async def drop_page(page):
+            nonlocal live_pages
+            if page is self.page and not page.is_closed():
+                stale_pages.append(page)
+            else:
+                live_pages -= 1
+                if not page.is_closed():
+                    await page.close()
+            async with pages_changed:
+                pages_changed.notify_all()
+
+        async def take_page():
+            nonlocal live_pages
+            while True:
+                if idle_pages:
+                    return idle_pages.pop()
+                if stale_pages:
+                    page = stale_pages.pop()
+                    try:
+                        return page, await self._navigate_to_course(page)
+                    except Exception:
+                        # Free its slot; the retry queue opens a new main page
+                        stale_pages.clear()
+                        await page.close()
+                        await drop_page(page)
+                        raise
+                page = await self._new_page(wait_for_slot=live_pages == 0)
+                if page is not None:
+                    live_pages += 1
+                    opened_pages.append(page)
+                    try:
+                        return page, await self._navigate_to_course(page)
+                    except Exception:
+                        await drop_page(page)
+                        raise
+                async with pages_changed:
+                    await pages_changed.wait_for(lambda: idle_pages or stale_pages or live_pages == 0)
+
+        async def crawl_job(title, filepath, crawl):
+            if self.journal.is_done(filepath):
+                logging.info(f"Already crawled, skipping: {title}")
+                return
+            async with semaphore:
+                try:
+                    page, frame = await take_page()
+                except Exception as e:
+                    # The page could not open the course; the lesson stays pending for the retry queue
+                    logging.error(f"Error crawling lesson '{title}': {e}")
+                    return
+                if await self._crawl_tracked(title, filepath, crawl, frame):
+                    idle_pages.append((page, frame))
+                    async with pages_changed:
+                        pages_changed.notify_all()
+                else:
+                    await drop_page(page)
+
+        await asyncio.gather(*(crawl_job(title, filepath, crawl) for title, filepath, crawl in jobs))
+
+        for page in opened_pages:
+            if not page.is_closed():
+                await page.close()
+
+    async def _crawl_tracked(self, title, filepath, crawl, frame=None):
+        """Crawl one lesson and record a failure in the journal.
+
+        The lesson is marked done once it is written (_write_stage). Returns
+        False if the lesson failed; the error is logged, not raised.
+        """
+        if self.journal.is_done(filepath):
+            logging.info(f"Already crawled, skipping: {title}")
+            return True
+
+        self.journal.start(filepath, title)
+        token = current_lesson.set(title)
+        try:
+            await crawl(frame or self.course_frame)
+        except Exception as e:
+            logging.error(f"Error crawling lesson '{title}': {e}")
+            self.journal.mark_failed(filepath, e)
+            return False
+        finally:
+            current_lesson.reset(token)
+        return True
+
+    async def _retry_unfinished(self):
+        """Retry lessons that failed (or never started), on a freshly opened course"""
+        jobs = {filepath: (title, crawl) for title, filepath, crawl in self._plan_crawl()}
+
+        for attempt in range(1, self.max_retries + 1):
+            unfinished = [filepath for filepath in jobs if not self.journal.is_done(filepath)]
+            if not unfinished:
+                return
+
+            delay = self.retry_backoff * 2 ** (attempt - 1)
+            logging.info(f"Retrying {len(unfinished)} lessons in {delay:.0f}s "
+                         f"(round {attempt} of {self.max_retries})")
+            await asyncio.sleep(delay)
 
-        await nav_link.click()
+            try:
+                await self._reopen_course()
+            except Exception as e:
+                logging.error(f"Could not reopen the course: {e}")
+                continue
 
-        # Wait for navigation to complete
-        await asyncio.sleep(2)
-        try:
-            await self.page.wait_for_load_state('networkidle', timeout=10000)
-        except Exception:
-            pass
-        await asyncio.sleep(5)
+            for filepath in unfinished:
+                title, crawl = jobs[filepath]
+                await self._crawl_tracked(title, filepath, crawl)
+            if self.pipeline:
+                await self.pipeline.join()
+
+    async def _reopen_course(self):
+        """Open the course on a new main page, relaunching the browser if it died"""
+        if not self.browser.is_connected():
+            if not self.owns_browser:
+                raise Exception("The shared browser is gone")
+            logging.warning("Browser disconnected; relaunching it")
+            self.browser = await self.playwright.chromium.launch(headless=self.headless)
+
+        if self.page and not self.page.is_closed():
+            try:
+                await self.page.close()
+            except Exception:
+                # Pages of a crashed browser can't be closed
+                pass
+        self.page = await self._new_page()
+        await self._navigate_to_course()
 
-        # Extract content
-        content = await self._extract_lesson_content()
-        
-        # Generate markdown
-        markdown = self._generate_introduction_markdown(intro['title'], content)
-        
-        # Save to file
-        filepath = os.path.join(self.output_dir, "01_Introduction.md")
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(markdown)
+    @property
+    def failed_lessons(self):
+        """Titles of lessons whose last attempt failed"""
+        return self.journal.failed_titles()
+
+    async def _crawl_introduction(self, intro, frame=None):
+        """Crawl the introduction lesson"""
+        frame = frame or self.course_frame
+        logging.info(f"\nCrawling Introduction: {intro['title']}")
+
+        content = await self._lesson_content(frame, intro)
         
-        logging.info(f"✓ Saved to: {filepath}")
+        lesson = {'kind': 'introduction', 'title': intro['title']}
+        await self._save_lesson(self._introduction_filepath(), lesson, content, frame,
+                                self._source_fingerprint(intro))
 
-    async def _crawl_lesson(self, lesson, lesson_num, module_num, module_title, module_dir):
+    async def _crawl_lesson(self, lesson, lesson_num, module_num, module_title, module_dir, frame=None):
         """Crawl a single lesson within a module"""
+        frame = frame or self.course_frame
         lesson_title = lesson['title']
 
         logging.info(f"\n{'-'*60}")
         logging.info(f"Crawling: Module {module_num}.{lesson_num} - {lesson_title}")
         logging.info(f"{'-'*60}")
 
-        # Click by matching the title text exactly
-        nav_link = self.course_frame.locator(f"nav a:has-text('{lesson_title}')").first
-
-        # Verify the link exists
-        link_count = await nav_link.count()
-        if link_count == 0:
-            logging.error(f"Could not find navigation link for: {lesson_title}")
+        content = await self._lesson_content(frame, lesson)
+        source_fingerprint = self._source_fingerprint(lesson)
+        
+        filepath = self._lesson_filepath(lesson_num, lesson_title, module_dir)
+        lesson = {
+            'kind': 'lesson',
+            'title': lesson_title,
+            'lesson_num': lesson_num,
+            'module_title': module_title,
+            'module_num': module_num
+        }
+        await self._save_lesson(filepath, lesson, content, frame, source_fingerprint)
+
+    async def _save_lesson(self, filepath, lesson, content, frame, source_fingerprint=None):
+        """Hand an extracted lesson to the render and write stages"""
+        item = {'filepath': filepath, 'lesson': lesson, 'content': content, 'base_url': frame.url,
+                'source_fingerprint': source_fingerprint}
+        if self.pipeline:
+            await self.pipeline.submit(item)
             return
 
-        click_text = await nav_link.inner_text()
-        logging.info(f"   Clicking nav item: '{click_text.strip()}'")
+        # Outside run() (no pipeline), render and write right away
+        item = await self._render_stage(item)
+        if item is not None:
+            await self._write_stage(item)
+
+    def _start_pipeline(self):
+        # Rendering waits on asset downloads and conversion processes, so it
+        # gets a worker per browser page; writes are quick
+        pipeline = LessonPipeline(
+            [('render', self._render_stage, max(2, self.concurrency)), ('write', self._write_stage, 2)],
+            on_error=self._on_stage_error,
+            maxsize=self.queue_size
+        )
+        pipeline.start()
+        return pipeline
+
+    async def _render_stage(self, item):
+        """Markdown for an extracted lesson, or None if it is unchanged"""
+        filepath, lesson, content = item['filepath'], item['lesson'], item['content']
+        # Fingerprint the content as extracted, before assets and markdown are added to it,
+        # so it can be compared with the next crawl's extracted content
+        fingerprint = content_fingerprint(content) if self.manifest else None
+        if self._is_unchanged(filepath, lesson['title'], fingerprint, item.get('source_fingerprint')):
+            self.journal.mark_done(filepath)
+            return None
+        
+        with self.tracer.span('render', lesson=lesson['title']):
+            # Download images and videos
+            content = await self._localize_assets(content, filepath, item['base_url'])
+            
+            # Structured markdown from the content HTML, converted in another process
+            if content.get('html'):
+                await asyncio.to_thread(save_cached_lesson, self.output_dir, filepath, lesson, content)
+                if self.converter:
+                    content = dict(content, markdown=await self.converter.convert(content['html']))
+            
+            return dict(item, content=content, fingerprint=fingerprint,
+                        markdown=self._render_markdown(lesson, content))
 
-        await nav_link.click()
+    async def _write_stage(self, item):
+        """Write a rendered lesson (atomically, in a thread) and mark it done"""
+        filepath = item['filepath']
+        with self.tracer.span('write', lesson=item['lesson']['title']):
+            await asyncio.to_thread(write_text_atomic, filepath, item['markdown'])
+        
+        self._record_written(filepath, item['lesson']['title'], item['fingerprint'], item.get('source_fingerprint'))
+        self.journal.mark_done(filepath)
+        logging.info(f"✓ Saved to: {filepath}")
 
-        # Wait for navigation to complete
-        await asyncio.sleep(2)
-        try:
-            await self.page.wait_for_load_state('networkidle', timeout=10000)
-        except Exception:
-            pass
-        await asyncio.sleep(5)
-
-        # Extract content
-        content = await self._extract_lesson_content()
-        
-        # Generate markdown
-        markdown = self._generate_lesson_markdown(
-            lesson_title,
-            lesson_num,
-            module_title,
-            module_num,
+    def _on_stage_error(self, item, error):
+        logging.error(f"Error saving lesson '{item['lesson']['title']}': {error}")
+        self.journal.mark_failed(item['filepath'], error)
+
+    def _render_markdown(self, lesson, content):
+        """Markdown for a lesson described by the dict built in _crawl_introduction/_crawl_lesson"""
+        if lesson['kind'] == 'introduction':
+            return self._generate_introduction_markdown(lesson['title'], content)
+        return self._generate_lesson_markdown(
+            lesson['title'],
+            lesson['lesson_num'],
+            lesson['module_title'],
+            lesson['module_num'],
             content
         )
-        
-        # Save to file
+
+    def _introduction_filepath(self):
+        return os.path.join(self.output_dir, "01_Introduction.md")
+
+    def _module_dir(self, module_num, module_title):
+        return os.path.join(
+            self.output_dir,
+            f"Module_{module_num:02d}_{self._sanitize_filename(module_title)}"
+        )
+
+    def _lesson_filepath(self, lesson_num, lesson_title, module_dir):
         filename = f"{lesson_num:02d}_{self._sanitize_filename(lesson_title)}.md"
-        filepath = os.path.join(module_dir, filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(markdown)
-        
-        logging.info(f"✓ Saved to: {filepath}")
+        return os.path.join(module_dir, filename)
 
-    async def _extract_lesson_content(self):
+    def _lesson_files(self):
+        """(lesson, output file) for every lesson in the course structure"""
+        files = [(self.course_structure['introduction'], self._introduction_filepath())]
+        for module in self.course_structure['modules']:
+            module_dir = self._module_dir(module['module_number'], module['module_title'])
+            for lesson_idx, lesson in enumerate(module['lessons'], 1):
+                files.append((lesson, self._lesson_filepath(lesson_idx, lesson['title'], module_dir)))
+        return files
+
+    def _expected_files(self):
+        """Output file of every lesson in the course structure"""
+        return [filepath for _, filepath in self._lesson_files()]
+
+    def _extracts_from_payload(self):
+        return self.extraction == 'network' and self.course_payload is not None
+
+    def _source_fingerprint(self, lesson):
+        """In incremental mode, hash of the lesson's entry in the course payload (None if not found)
+
+        The raw entry, not the parsed content: in DOM mode a block the payload
+        parser ignores must still count as a change.
+        """
+        if not self.manifest or self.course_payload is None:
+            return None
+        entry = self.course_payload.lookup_raw(lesson)
+        return content_fingerprint(entry) if entry is not None else None
+
+    def _skip_unchanged_lessons(self):
+        """In incremental mode, mark lessons whose course payload didn't change as done
+
+        They are skipped before any page work, so an unchanged course is not
+        clicked through. Without a recognized payload nothing is skipped here;
+        every lesson is opened and compared after extraction (_is_unchanged).
+        """
+        if not self.manifest or self.course_payload is None:
+            return
+        skipped = 0
+        for lesson, filepath in self._lesson_files():
+            if self.journal.is_done(filepath):
+                continue
+            if self.manifest.is_source_unchanged(filepath, self._source_fingerprint(lesson)):
+                self.manifest.mark_unchanged(filepath, lesson['title'])
+                self.journal.mark_done(filepath)
+                skipped += 1
+        logging.info(f"Course payload unchanged for {skipped} lessons; not opening them")
+
+    def _is_unchanged(self, filepath, title, fingerprint, source_fingerprint=None):
+        """In incremental mode, True if the lesson's content fingerprint matches the last crawl"""
+        if not self.manifest:
+            return False
+        if self.manifest.is_unchanged(filepath, fingerprint):
+            self.manifest.mark_unchanged(filepath, title, source_fingerprint)
+            logging.info(f"= Unchanged, skipping: {filepath}")
+            return True
+        return False
+
+    async def _localize_assets(self, content, filepath, base_url):
+        """Download a lesson's images and videos and add each one's path relative to the markdown file"""
+        if not self.asset_downloader:
+            return content
+
+        urls = [urljoin(base_url, img['src']) for img in content['images']]
+        urls += [urljoin(base_url, video['url']) for video in content['videos'] if video['type'] == 'video']
+        paths = await self.asset_downloader.fetch_all(urls)
+        self.asset_downloader.save_manifest()
+
+        markdown_dir = os.path.dirname(filepath)
+
+        def local(url):
+            path = paths.get(urljoin(base_url, url))
+            return Path(os.path.relpath(path, markdown_dir)).as_posix() if path else None
+
+        logging.info(f"   Assets: {len(paths)}/{len(urls)} saved locally")
+        return dict(
+            content,
+            images=[dict(img, local=local(img['src'])) for img in content['images']],
+            videos=[dict(video, local=local(video['url'])) if video['type'] == 'video' else video
+                    for video in content['videos']]
+        )
+
+    def _record_written(self, filepath, title, fingerprint, source_fingerprint=None):
+        if self.manifest:
+            self.manifest.record(filepath, title, fingerprint, source_fingerprint)
+
+    async def _lesson_content(self, frame, lesson):
+        """Content of a lesson, from the course payload or else by opening it"""
+        title = lesson['title']
+        if self._extracts_from_payload():
+            content = self.course_payload.lookup(lesson)
+            if content is not None:
+                logging.info(f"   From course payload: {len(content['images'])} images, "
+                             f"{len(content['videos'])} videos, {len(content['links'])} links")
+                return content
+            logging.warning(f"   '{title}' not found in course payload by id, "
+                            f"or its title is ambiguous; opening it")
+
+        stats = self.page_stats.get(frame.page)
+        before = stats.snapshot() if stats else None
+
+        if self.lesson_traces:
+            await self.lesson_traces.begin(frame.page, title)
+        started = time.monotonic()
+        try:
+            await self._open_lesson(frame, lesson)
+            opened = time.monotonic()
+            with self.tracer.span('extract'):
+                content = await self._extract_lesson_content(frame)
+        finally:
+            if self.lesson_traces:
+                await self.lesson_traces.end(frame.page, title, (time.monotonic() - started) * 1000)
+        if self.pipeline:
+            self.pipeline.record('navigate', opened - started)
+            self.pipeline.record('extract', time.monotonic() - opened)
+
+        if stats:
+            self.lesson_stats[title] = stats.since(before)
+            logging.info(f"   Network: {format_stats(self.lesson_stats[title])}")
+        return content
+
+    def _log_resource_summary(self):
+        """Log what all pages loaded and blocked over the whole crawl"""
+        if not self.page_stats:
+            return
+        total = {'requests': 0, 'bytes_loaded': 0, 'blocked': {}}
+        for stats in self.page_stats.values():
+            snapshot = stats.snapshot()
+            total['requests'] += snapshot['requests']
+            total['bytes_loaded'] += snapshot['bytes_loaded']
+            for kind, n in snapshot['blocked'].items():
+                total['blocked'][kind] = total['blocked'].get(kind, 0) + n
+        logging.info(f"Network ({self.block_profile} profile): {format_stats(total)}")
+
+    async def _open_lesson(self, frame, lesson):
+        """Click a lesson in the sidebar and wait until it is ready to extract"""
+        # Find the link by href (stable), or by its position in the sidebar
+        href = lesson.get('href')
+        if href:
+            nav_link = frame.locator(f"nav a[href={json.dumps(href, ensure_ascii=False)}]").first
+        else:
+            nav_link = frame.locator("nav a").nth(lesson['nav_index'])
+
+        with self.tracer.span('click'):
+            # Verify the link exists
+            if await nav_link.count() == 0:
+                raise Exception(f"Could not find navigation link for: {lesson['title']}")
+
+            logging.info(f"   Clicking nav item [{lesson['nav_index']}]: '{lesson['title']}'")
+
+            previous_state = await nav_state(frame)
+            await nav_link.click()
+
+        # Wait for the lesson to show and its DOM to settle
+        with self.tracer.span('wait'):
+            await wait_for_lesson_ready(frame, previous_state, href, self.timeouts)
+
+    async def _extract_lesson_content(self, frame=None):
         """Extract text, images, videos from current lesson"""
+        frame = frame or self.course_frame
+        if self.extraction == 'per-element':
+            return await self._extract_lesson_content_per_element(frame)
+        return await self._extract_lesson_content_in_page(frame)
+
+    async def _extract_lesson_content_in_page(self, frame):
+        """Extract everything in a single round trip (see crawl_extract.py)"""
+        content = await extract_lesson_payload(frame)
+        if content is None:
+            logging.warning("Could not find content element")
+            return {'text': '', 'html': '', 'images': [], 'videos': [], 'links': []}
+
+        logging.info(f"   Images: {len(content['images'])}")
+        logging.info(f"   Videos: {len(content['videos'])}")
+        logging.info(f"   Links: {len(content['links'])}")
+        return content
+
+    async def _extract_lesson_content_per_element(self, frame):
+        """Extract content with one Playwright call per element and attribute"""
         content = {
             'text': '',
+            'html': '',
             'images': [],
             'videos': [],
             'links': []
@@ -335,7 +765,7 @@ class Rise360Crawler:
         content_element = None
         for selector in content_selectors:
             try:
-                element = self.course_frame.locator(selector).first
+                element = frame.locator(selector).first
                 if await element.count() > 0:
                     content_element = element
                     break
@@ -360,6 +790,7 @@ class Rise360Crawler:
             ]
             
             content['text'] = text
+            content['html'] = await content_element.inner_html()
         except Exception as e:
             logging.debug(f"Error extracting text: {e}")
         
@@ -430,89 +861,97 @@ class Rise360Crawler:
 
     def _generate_introduction_markdown(self, title, content):
         """Generate markdown for the introduction"""
-        md = f"# {title}\n\n"
-        md += "**Course Introduction**\n\n"
-        md += "---\n\n"
+        md = [f"# {title}\n\n"]
+        md.append("**Course Introduction**\n\n")
+        md.append("---\n\n")
         
         # Summary
-        md += "## Overview\n\n"
-        md += f"- **Images:** {len(content['images'])}\n"
-        md += f"- **Videos:** {len(content['videos'])}\n"
-        md += f"- **External Links:** {len(content['links'])}\n\n"
-        md += "---\n\n"
+        md.append("## Overview\n\n")
+        md.append(f"- **Images:** {len(content['images'])}\n")
+        md.append(f"- **Videos:** {len(content['videos'])}\n")
+        md.append(f"- **External Links:** {len(content['links'])}\n\n")
+        md.append("---\n\n")
         
         # Main content
-        if content['text']:
-            md += "## Content\n\n"
-            md += f"{content['text'].strip()}\n\n"
+        if content.get('markdown'):
+            md.append("## Content\n\n")
+            md.append(f"{content['markdown']}\n\n")
+        elif content['text']:
+            md.append("## Content\n\n")
+            md.append(f"{content['text'].strip()}\n\n")
         
         # Add media sections
-        md += self._format_media_sections(content)
+        md.append(self._format_media_sections(content))
         
-        return md
+        return "".join(md)
 
     def _generate_lesson_markdown(self, lesson_title, lesson_num, module_title, module_num, content):
         """Generate formatted markdown for a lesson"""
-        md = f"# {lesson_title}\n\n"
-        md += f"**Module {module_num}: {module_title}**  \n"
-        md += f"**Lesson {module_num}.{lesson_num}**\n\n"
-        md += "---\n\n"
+        md = [f"# {lesson_title}\n\n"]
+        md.append(f"**Module {module_num}: {module_title}**  \n")
+        md.append(f"**Lesson {module_num}.{lesson_num}**\n\n")
+        md.append("---\n\n")
         
         # Summary
-        md += "## Overview\n\n"
-        md += f"- **Images:** {len(content['images'])}\n"
-        md += f"- **Videos:** {len(content['videos'])}\n"
-        md += f"- **External Links:** {len(content['links'])}\n\n"
-        md += "---\n\n"
-        
-        # Main text content
-        if content['text']:
-            md += "## Lesson Content\n\n"
-            md += f"{content['text'].strip()}\n\n"
+        md.append("## Overview\n\n")
+        md.append(f"- **Images:** {len(content['images'])}\n")
+        md.append(f"- **Videos:** {len(content['videos'])}\n")
+        md.append(f"- **External Links:** {len(content['links'])}\n\n")
+        md.append("---\n\n")
+        
+        # Main text content (structured markdown when the HTML was converted)
+        if content.get('markdown'):
+            md.append("## Lesson Content\n\n")
+            md.append(f"{content['markdown']}\n\n")
+        elif content['text']:
+            md.append("## Lesson Content\n\n")
+            md.append(f"{content['text'].strip()}\n\n")
         
         # Add media sections
-        md += self._format_media_sections(content)
+        md.append(self._format_media_sections(content))
         
-        return md
+        return "".join(md)
 
     def _format_media_sections(self, content):
         """Format images, videos, and links sections"""
-        md = ""
+        md = []
         
         # Images section
         if content['images']:
-            md += "---\n\n"
-            md += "## Images\n\n"
+            md.append("---\n\n")
+            md.append("## Images\n\n")
             for i, img in enumerate(content['images'], 1):
-                md += f"### Image {i}\n\n"
+                md.append(f"### Image {i}\n\n")
                 if img['alt']:
-                    md += f"**Description:** {img['alt']}\n\n"
+                    md.append(f"**Description:** {img['alt']}\n\n")
                 if img['title']:
-                    md += f"**Title:** {img['title']}\n\n"
-                md += f"**URL:** `{img['src']}`\n\n"
-                md += f"![{img['alt']}]({img['src']})\n\n"
+                    md.append(f"**Title:** {img['title']}\n\n")
+                md.append(f"**URL:** `{img['src']}`\n\n")
+                md.append(f"![{img['alt']}]({img.get('local') or img['src']})\n\n")
         
         # Videos section
         if content['videos']:
-            md += "---\n\n"
-            md += "## Videos\n\n"
+            md.append("---\n\n")
+            md.append("## Videos\n\n")
             for i, video in enumerate(content['videos'], 1):
-                md += f"### Video {i}\n\n"
-                md += f"**Type:** {video['type']}\n\n"
-                md += f"**URL:** `{video['url']}`\n\n"
+                md.append(f"### Video {i}\n\n")
+                md.append(f"**Type:** {video['type']}\n\n")
+                md.append(f"**URL:** `{video['url']}`\n\n")
+                if video.get('local'):
+                    md.append(f"**File:** [{video['local']}]({video['local']})\n\n")
         
         # Links section
         if content['links']:
-            md += "---\n\n"
-            md += "## External Resources\n\n"
+            md.append("---\n\n")
+            md.append("## External Resources\n\n")
             for link in content['links']:
-                md += f"- [{link['text']}]({link['url']})\n"
-            md += "\n"
+                md.append(f"- [{link['text']}]({link['url']})\n")
+            md.append("\n")
         
-        md += "---\n\n"
-        md += f"*Extracted from Rise360 Course*\n"
+        md.append("---\n\n")
+        md.append(f"*Extracted from Rise360 Course*\n")
         
-        return md
+        return "".join(md)
 
     async def _save_course_index(self):
         """Save course structure to index files"""
@@ -0,0 +1,422 @@
+"""
+NMO Training Bot - Answer Evaluation
+====================================
+
+Grades a trainee's answer with OpenAI.
+
+This module deliberately makes NO Streamlit calls, so it can run from the
+Streamlit script thread, from background prefetch threads (see prefetch.py)
+and from command-line tools alike. The Streamlit-facing wrapper with the
+friendly error messages lives in app.py (`evaluate_answer`).
+
+Three things make repeated evaluations cheap:
+    - Compiled prompts: the per-question part of the prompt is built once
+    - A shared OpenAI client: its HTTP connection pool is reused
+    - An evaluation cache: identical answers to the same question are
+      only sent to OpenAI once
+
+If the crawled course has been indexed (see lesson_index.py), the lesson
+excerpt that best covers each question is added to its prompt and returned
+with the result so the app can show it.
+
+A rate limiter keeps us under OpenAI's requests-per-minute limit. When the
+app runs as several processes, the cache and rate limiter can be shared
+through one SQLite file (see shared_store.py).
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+import hashlib                  # For building cache keys
+import json                     # For parsing OpenAI's JSON responses
+import os                       # For environment variables
+import threading                # The client and cache are shared by threads
+import time                     # For the rate limiter
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+from openai import OpenAI       # For AI evaluation
+
+from lesson_index import LessonIndex, trim_to_tokens
+from normalize import fold
+import traffic_capture
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+MODEL = "gpt-4o-mini"  # Use gpt-4o-mini for cost efficiency
+TEMPERATURE = 0.3      # Lower temperature = more consistent responses
+
+# How many evaluation results to keep in memory (oldest are dropped first)
+EVALUATION_CACHE_SIZE = int(os.getenv("NMO_EVALUATION_CACHE_SIZE", "2048"))
+
+# Maximum OpenAI requests per minute (0 = no limit)
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("NMO_OPENAI_RPM", "500"))
+
+# Optional lesson excerpt index built from the crawled course (see
+# lesson_index.py). When it exists, the best matching excerpt is shown with
+# the feedback and added to the prompt.
+LESSON_INDEX_FILE = os.getenv("NMO_LESSON_INDEX", str(Path(__file__).parent.parent / "data" / "lesson_index.bin"))
+
+# Most prompt tokens the lesson excerpt may use (0 = don't add it to the prompt)
+LESSON_EXCERPT_TOKENS = int(os.getenv("NMO_LESSON_EXCERPT_TOKENS", "200"))
+
+# Optional SQLite file shared by several app processes (see shared_store.py).
+# When set, the evaluation cache and rate limiter are shared by all workers.
+SHARED_STORE_PATH = os.getenv("NMO_SHARED_STORE")
+
+# We ask OpenAI to return JSON so we can parse the response reliably
+SYSTEM_PROMPT = """You are an evaluator for a missionary training program.
+Your job is to determine if a trainee's answer is acceptable and provide helpful feedback.
+
+You MUST respond with valid JSON in this exact format:
+{
+    "is_correct": true or false,
+    "feedback": "Your feedback message here",
+    "refer_to_trainer": true or false
+}
+
+Be encouraging but accurate. If the answer is partially correct, you may accept it
+but note what could be improved in your feedback."""
+
+# Everything before the trainee's answer only depends on the question, so it
+# is compiled once per question (see compile_prompt)
+USER_PROMPT_PREFIX = """Evaluate this trainee's answer:
+
+QUESTION: {question}
+
+CORRECT ANSWER CRITERIA: {correct_answer}
+
+INSTRUCTIONS FOR EVALUATION: {instructions}
+{reference}
+TRAINEE'S ANSWER: """
+
+# Added to the prompt when a matching lesson excerpt was found
+REFERENCE_TEMPLATE = """
+RELEVANT ORIENTATION MATERIAL (from the lesson "{lesson}"):
+{excerpt}
+"""
+
+USER_PROMPT_SUFFIX = """
+
+Remember to respond with JSON only."""
+
+# Returned when OpenAI's reply could not be parsed (never cached)
+INVALID_RESPONSE_RESULT = {
+    "is_correct": False,
+    "feedback": "There was an error evaluating your answer. Please try again.",
+    "refer_to_trainer": False
+}
+
+
+# =============================================================================
+# LESSON REFERENCES
+# =============================================================================
+
+_lesson_index = None
+_lesson_index_lock = threading.Lock()
+
+
+def get_lesson_index():
+    """Return the memory-mapped lesson index, or None if it hasn't been built."""
+    global _lesson_index
+
+    if _lesson_index is None and Path(LESSON_INDEX_FILE).exists():
+        with _lesson_index_lock:
+            if _lesson_index is None:
+                _lesson_index = LessonIndex(LESSON_INDEX_FILE)
+
+    return _lesson_index
+
+
+@lru_cache(maxsize=256)
+def find_lesson_reference(question: str, correct_answer: str):
+    """
+    Find the lesson excerpt that best covers a question.
+
+    Returns:
+        dict with keys lesson, module and excerpt, or None if there is no
+        index or nothing matched
+    """
+    index = get_lesson_index()
+    if index is None:
+        return None
+
+    matches = index.search(f"{question}\n{correct_answer}")
+    if not matches:
+        return None
+
+    best = matches[0]
+    return {"lesson": best["lesson"], "module": best["module"], "excerpt": best["text"]}
+
+
+# =============================================================================
+# COMPILED PROMPTS
+# =============================================================================
+
+@lru_cache(maxsize=256)
+def compile_prompt(question: str, correct_answer: str, instructions: str) -> dict:
+    """
+    Build the answer-independent part of the evaluation prompt.
+
+    Returns:
+        dict with keys:
+            - key (str): Stable fingerprint of the question, used in cache keys
+            - prefix (str): User prompt text up to the trainee's answer
+            - reference (dict or None): Matching lesson excerpt, if any
+    """
+    reference = find_lesson_reference(question, correct_answer)
+
+    reference_text = ""
+    if reference and LESSON_EXCERPT_TOKENS > 0:
+        reference_text = REFERENCE_TEMPLATE.format(
+            lesson=reference["lesson"],
+            excerpt=trim_to_tokens(reference["excerpt"], LESSON_EXCERPT_TOKENS)
+        )
+
+    prefix = USER_PROMPT_PREFIX.format(
+        question=question,
+        correct_answer=correct_answer,
+        instructions=instructions,
+        reference=reference_text
+    )
+    key = hashlib.sha256((SYSTEM_PROMPT + prefix).encode("utf-8")).hexdigest()
+    return {"key": key, "prefix": prefix, "reference": reference}
+
+
+def build_messages(compiled: dict, user_answer: str) -> list:
+    """Create the chat messages for one answer from a compiled prompt."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": compiled["prefix"] + user_answer + USER_PROMPT_SUFFIX}
+    ]
+
+
+def answer_cache_key(compiled: dict, normalized_answer: str) -> str:
+    """
+    Cache key for one (normalized) answer to one question.
+
+    Answers are normalized first (see normalize.py), so "I don't know",
+    "IDK" and "not sure" can all share one cache entry.
+    """
+    return hashlib.sha256(f"{compiled['key']}\n{normalized_answer}".encode("utf-8")).hexdigest()
+
+
+# =============================================================================
+# OPENAI CLIENT
+# =============================================================================
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> OpenAI:
+    """
+    Return the process-wide OpenAI client, creating it on first use.
+
+    Sharing one client means every evaluation reuses the same pool of open
+    HTTPS connections instead of paying for a new TLS handshake each time.
+
+    Raises:
+        RuntimeError: If OPENAI_API_KEY is not set
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    raise RuntimeError("OPENAI_API_KEY is not set")
+                _client = OpenAI(api_key=api_key)
+
+    return _client
+
+
+def warm_connection():
+    """
+    Open a connection to the OpenAI API ahead of the first real evaluation.
+
+    Retrieving the model's metadata is a tiny request, but it leaves a live
+    keep-alive connection in the client's pool for the next chat request.
+    """
+    get_client().models.retrieve(MODEL)
+
+
+# =============================================================================
+# EVALUATION CACHE
+# =============================================================================
+
+class EvaluationCache:
+    """
+    A small thread-safe LRU cache of evaluation results.
+
+    Results are stored as plain dicts; callers always get a copy so they
+    can't accidentally modify the cached value.
+    """
+
+    def __init__(self, max_size: int = EVALUATION_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                return None
+            self._entries.move_to_end(key)
+            return dict(result)
+
+    def put(self, key: str, result: dict):
+        with self._lock:
+            self._entries[key] = dict(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+
+# =============================================================================
+# RATE LIMITER
+# =============================================================================
+
+class RateLimiter:
+    """
+    Token bucket that keeps us under OpenAI's requests-per-minute limit.
+
+    The bucket starts full, so short bursts go through immediately; after
+    that, callers wait until a token has been refilled.
+    """
+
+    def __init__(self, requests_per_minute: int = OPENAI_REQUESTS_PER_MINUTE):
+        self.requests_per_minute = requests_per_minute
+        self._tokens = float(requests_per_minute)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Wait until a request may be sent, then use up one token."""
+        if self.requests_per_minute <= 0:
+            return
+
+        capacity = float(self.requests_per_minute)
+        per_second = capacity / 60.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(capacity, self._tokens + (now - self._updated_at) * per_second)
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / per_second
+
+            time.sleep(wait)
+
+
+# One cache and one rate limiter per process, or shared by all workers
+if SHARED_STORE_PATH:
+    from shared_store import SharedStore, SharedEvaluationCache, SharedRateLimiter
+
+    _shared_store = SharedStore(SHARED_STORE_PATH)
+    evaluation_cache = SharedEvaluationCache(_shared_store, EVALUATION_CACHE_SIZE)
+    rate_limiter = SharedRateLimiter(_shared_store, OPENAI_REQUESTS_PER_MINUTE)
+else:
+    evaluation_cache = EvaluationCache()
+    rate_limiter = RateLimiter()
+
+
+# =============================================================================
+# EVALUATION
+# =============================================================================
+
+def evaluate(question: str, correct_answer: str, user_answer: str, instructions: str,
+             normalized_answer: str = None, capture: bool = False) -> dict:
+    """
+    Evaluate an answer, using the cache when the same answer was seen before.
+
+    Args:
+        question: The question that was asked
+        correct_answer: The expected/correct answer criteria
+        user_answer: What the user typed (this is what OpenAI sees)
+        instructions: What to do if correct/incorrect (from CSV)
+        normalized_answer: The answer's canonical form from the question's
+            AnswerNormalizer, used for caching. Defaults to normalize.fold.
+        capture: Record this evaluation if traffic capture is enabled
+            (see traffic_capture.py). Prefetching leaves this off.
+
+    Returns:
+        dict with keys is_correct, feedback and refer_to_trainer, plus
+        reference (the matching lesson excerpt, or None)
+
+    Raises:
+        Any OpenAI/network error - the caller decides how to show it
+    """
+    if normalized_answer is None:
+        normalized_answer = fold(user_answer)
+
+    started = time.perf_counter()
+    result, cache_hit = evaluate_with_outcome(question, correct_answer, user_answer, instructions, normalized_answer)
+
+    if capture:
+        traffic_capture.record({
+            "ts": time.time(),
+            "question": question,
+            "correct_answer": correct_answer,
+            "instructions": instructions,
+            "user_answer": user_answer,
+            "normalized_answer": normalized_answer,
+            "result": {key: value for key, value in result.items() if key != "reference"},
+            "cache": "hit" if cache_hit else "miss",
+            "latency_ms": round((time.perf_counter() - started) * 1000, 3)
+        })
+
+    return result
+
+
+def evaluate_with_outcome(question: str, correct_answer: str, user_answer: str, instructions: str,
+                          normalized_answer: str) -> tuple:
+    """
+    Like evaluate(), but also says whether the result came from the cache.
+
+    Returns:
+        (result dict, cache_hit bool)
+    """
+    compiled = compile_prompt(question, correct_answer, instructions)
+    cache_key = answer_cache_key(compiled, normalized_answer)
+
+    cached = evaluation_cache.get(cache_key)
+    if cached is not None:
+        return cached, True
+
+    rate_limiter.acquire()
+    response = get_client().chat.completions.create(
+        model=MODEL,
+        messages=build_messages(compiled, user_answer),
+        response_format={"type": "json_object"},  # Force JSON response
+        temperature=TEMPERATURE
+    )
+
+    try:
+        result = json.loads(response.choices[0].message.content)
+    except json.JSONDecodeError:
+        # If OpenAI didn't return valid JSON, don't remember the failure
+        return {**INVALID_RESPONSE_RESULT, "reference": compiled["reference"]}, False
+
+    result = {
+        "is_correct": result.get("is_correct", False),
+        "feedback": result.get("feedback", "Unable to evaluate your answer."),
+        "refer_to_trainer": result.get("refer_to_trainer", False),
+        "reference": compiled["reference"]
+    }
+    evaluation_cache.put(cache_key, result)
+    return result, False
@@ -0,0 +1,298 @@
+"""
+NMO Training Bot - Multi-Worker Launcher
+========================================
+
+Runs several copies of the Streamlit app on one machine so a load balancer
+(nginx, HAProxy, a cloud load balancer...) can spread a large cohort across
+them. The workers share:
+
+    - One compiled, memory-mapped question bank (see question_bank.py), so
+      no worker parses the CSV; each still builds its own DataFrame from it
+    - One SQLite store for the evaluation cache and the OpenAI rate
+      limiter (see shared_store.py)
+
+Streamlit keeps each trainee's session in the process that served it, so
+the load balancer must use sticky sessions (e.g. ip_hash in nginx).
+
+Usage (from project root):
+    python src/launch_workers.py --workers 4 --base-port 8501
+
+Self-check (starts the workers in a temporary run dir, checks their
+health, runs the app with each worker's settings to verify the question
+bank and the shared cache, then shuts them down):
+    python src/launch_workers.py --workers 3 --check
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+import argparse
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from question_bank import QuestionBank, compile_question_bank
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+APP_FILE = PROJECT_ROOT / "src" / "app.py"
+QUESTIONS_FILE = PROJECT_ROOT / "data" / "questions.csv"
+
+# Where the compiled question bank and shared store go by default
+RUN_DIR = PROJECT_ROOT / ".nmo_run"
+
+# How long to wait for a worker to answer its health check
+STARTUP_TIMEOUT = 60
+
+# How long the app check may take per group of processes
+CHECK_TIMEOUT = 180
+
+# The --check answers the first question with this (in a temporary shared
+# store, so the fake evaluation never reaches real trainees)
+CHECK_ANSWER = "nmo launch_workers check"
+CHECK_FEEDBACK = "Evaluation cached by the launch_workers check."
+
+
+# =============================================================================
+# WORKERS
+# =============================================================================
+
+def start_workers(count: int, base_port: int, question_bank: Path, shared_store: Path) -> list:
+    """Start `count` Streamlit processes on consecutive ports."""
+    env = dict(os.environ)
+    env["NMO_QUESTION_BANK"] = str(question_bank)
+    env["NMO_SHARED_STORE"] = str(shared_store)
+
+    workers = []
+    for i in range(count):
+        port = base_port + i
+        command = [
+            sys.executable, "-m", "streamlit", "run", str(APP_FILE),
+            "--server.port", str(port),
+            "--server.headless", "true",
+        ]
+        workers.append((port, subprocess.Popen(command, env=env, cwd=PROJECT_ROOT)))
+        print(f"Started worker on port {port}")
+    return workers
+
+
+def stop_workers(workers: list):
+    for _, process in workers:
+        if process.poll() is None:
+            process.send_signal(signal.SIGTERM)
+    for _, process in workers:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def wait_until_healthy(port: int, process: subprocess.Popen, timeout: float = STARTUP_TIMEOUT) -> bool:
+    """Poll Streamlit's health endpoint until it answers "ok"."""
+    url = f"http://127.0.0.1:{port}/_stcore/health"
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if response.read().strip() == b"ok":
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+
+    return False
+
+
+# =============================================================================
+# SELF-CHECK
+# =============================================================================
+
+def _check_worker_app(worker_id: int, question_bank: str, shared_store: str, results):
+    """
+    Run in a fresh process with a worker's environment: run app.py with
+    Streamlit's AppTest and answer the first question through it.
+
+    Process 0 first stores an evaluation of CHECK_ANSWER in the shared cache;
+    every process must then get that evaluation back. The OpenAI key and URL
+    are placeholders, so a cache miss shows an error instead of calling OpenAI.
+
+    Always reports (worker_id, problems) on `results`, even if the check
+    itself raises.
+    """
+    try:
+        problems = _check_app(worker_id, question_bank, shared_store)
+    except Exception as e:
+        problems = [f"check failed: {type(e).__name__}: {e}"]
+    results.put((worker_id, problems))
+
+
+def _check_app(worker_id: int, question_bank: str, shared_store: str) -> list:
+    """The body of _check_worker_app; returns the problems found."""
+    os.environ["NMO_QUESTION_BANK"] = question_bank
+    os.environ["NMO_SHARED_STORE"] = shared_store
+    os.environ["OPENAI_API_KEY"] = "nmo-check"
+    os.environ["OPENAI_BASE_URL"] = "http://127.0.0.1:9/v1"
+
+    # load_questions() logs where it read the questions from
+    messages = []
+    handler = logging.Handler()
+    handler.emit = lambda record: messages.append(record.getMessage())
+    logging.getLogger().addHandler(handler)
+    logging.getLogger().setLevel(logging.INFO)
+
+    import pandas as pd
+    from streamlit.testing.v1 import AppTest
+
+    import evaluation
+    from normalize import build_normalizers
+
+    problems = []
+    app = AppTest.from_file(str(APP_FILE), default_timeout=60).run()
+    if app.exception:
+        return [f"app.py failed: {app.exception[0].message}"]
+    if not any(f"question bank {question_bank}" in message for message in messages):
+        problems.append("questions were not loaded from the question bank")
+
+    bank = QuestionBank(question_bank)
+    question = bank[0]
+    if worker_id == 0:
+        normalizer = build_normalizers(pd.DataFrame(bank.records(), columns=bank.columns))[question["question_id"]]
+        compiled = evaluation.compile_prompt(question["question"], question["correct_answer"],
+                                             question["feedback_incorrect"])
+        evaluation.evaluation_cache.put(
+            evaluation.answer_cache_key(compiled, normalizer(CHECK_ANSWER)),
+            {"is_correct": False, "feedback": CHECK_FEEDBACK, "refer_to_trainer": False, "reference": None}
+        )
+
+    app.text_area(key=f"answer_{question['question_id']}").input(CHECK_ANSWER)
+    app.button(key=f"submit_{question['question_id']}").click().run()
+    if app.exception:
+        problems.append(f"app.py failed on submit: {app.exception[0].message}")
+    elif not any(CHECK_FEEDBACK in markdown.value for markdown in app.markdown):
+        problems.append("the evaluation cached by process 0 was not a cache hit")
+
+    return problems
+
+
+def run_check(workers: list, question_bank: Path, shared_store: Path) -> bool:
+    """
+    Verify every worker is healthy, then run the app once per worker with
+    its environment and check it reads the question bank and shares the
+    evaluation cache.
+    """
+    ok = True
+
+    for port, process in workers:
+        healthy = wait_until_healthy(port, process)
+        print(f"  worker on port {port}: {'healthy' if healthy else 'NOT HEALTHY'}")
+        ok = ok and healthy
+
+    # Fresh interpreters, so each imports evaluation with the worker's settings
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+
+    def check(worker_ids):
+        checkers = [
+            context.Process(target=_check_worker_app, args=(i, str(question_bank), str(shared_store), results))
+            for i in worker_ids
+        ]
+        for checker in checkers:
+            checker.start()
+
+        # A process that dies or hangs never reports, so don't wait forever
+        reports = {}
+        deadline = time.monotonic() + CHECK_TIMEOUT
+        while len(reports) < len(checkers):
+            try:
+                worker_id, problems = results.get(timeout=max(0.1, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            reports[worker_id] = problems
+
+        for worker_id, checker in zip(worker_ids, checkers):
+            checker.join(timeout=5)
+            if checker.is_alive():
+                checker.terminate()
+                checker.join()
+            if worker_id not in reports:
+                reason = (f"exited with code {checker.exitcode}" if checker.exitcode not in (None, -signal.SIGTERM)
+                          else f"did not finish within {CHECK_TIMEOUT}s")
+                reports[worker_id] = [f"check process {reason} without reporting"]
+        return list(reports.items())
+
+    # Process 0 fills the cache before the others read it
+    reports = check([0]) + check(list(range(1, len(workers))))
+    for worker_id, problems in sorted(reports):
+        print(f"  app with worker {worker_id}'s settings: {'ok' if not problems else 'FAILED'}")
+        for problem in problems:
+            print(f"    - {problem}")
+        ok = ok and not problems
+
+    return ok
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several NMO Training Bot workers with shared caches.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Number of app processes.")
+    parser.add_argument("--base-port", type=int, default=8501, help="Port of the first worker.")
+    parser.add_argument("--run-dir", default=str(RUN_DIR), help="Directory for the compiled questions and shared store.")
+    parser.add_argument("--check", action="store_true",
+                        help="Start the workers in a temporary run dir, verify them, then stop.")
+    args = parser.parse_args()
+
+    # The check writes a fake evaluation to the shared store, so it never
+    # uses the run dir (and store) of the real workers
+    run_dir = Path(tempfile.mkdtemp(prefix="nmo-check-")) if args.check else Path(args.run_dir)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    question_bank = run_dir / "questions.qbank"
+    shared_store = run_dir / "shared.sqlite3"
+
+    # Compile once here so no worker has to parse the CSV
+    compile_question_bank(QUESTIONS_FILE, question_bank)
+    print(f"Compiled {len(QuestionBank(question_bank))} questions to {question_bank}")
+
+    workers = start_workers(args.workers, args.base_port, question_bank, shared_store)
+
+    try:
+        if args.check:
+            print("Checking workers...")
+            ok = run_check(workers, question_bank, shared_store)
+            print("Check passed." if ok else "Check FAILED.")
+            sys.exit(0 if ok else 1)
+
+        # Run until interrupted; if any worker dies, stop the rest
+        while all(process.poll() is None for _, process in workers):
+            time.sleep(1)
+        print("A worker exited; shutting down.")
+        sys.exit(1)
+
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_workers(workers)
+        if args.check:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
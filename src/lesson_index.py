@@ -0,0 +1,273 @@
+"""
+NMO Training Bot - Lesson Excerpt Index
+=======================================
+
+Lets the evaluator point trainees at the part of the orientation course
+that covers a question. The crawler (crawler.py) saves every lesson as
+markdown; this module turns that output into a small BM25 search index
+that the app memory-maps and queries in well under a millisecond.
+
+Build the index after crawling (from project root):
+    python src/lesson_index.py --input output --index data/lesson_index.bin
+
+Try a query:
+    python src/lesson_index.py --index data/lesson_index.bin --query "How do I share my Zoom link?"
+
+Index file layout (all integers little-endian):
+
+    MAGIC (8 bytes)                b"NMOLX01\\n"
+    excerpt count, term count (uint32 x 2)
+    section sizes (uint64 x 3)     excerpts JSON, vocabulary JSON, postings
+    excerpts JSON                  list of {"lesson", "module", "path", "text"}
+    vocabulary JSON                term -> [first posting, posting count]
+    postings                       (excerpt id uint32, BM25 weight float32)
+
+BM25 weights are computed when the index is built, so a query only has to
+add up the stored weights of its terms.
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+import argparse
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import time
+from collections import Counter
+from pathlib import Path
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+MAGIC = b"NMOLX01\n"
+HEADER = struct.Struct("<8sIIQQQ")
+POSTING = struct.Struct("<If")
+
+# Standard BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Lessons are split into excerpts of about this many words
+EXCERPT_WORDS = 120
+
+# Sections of the crawler's markdown that hold the lesson text
+CONTENT_HEADINGS = ("## Lesson Content", "## Content")
+
+# Last line of every crawled lesson file
+FOOTER = "*Extracted from Rise360 Course*"
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from has have how i if in is it its
+of on or our so that the their then there these this to was we what when
+where which who will with you your
+""".split())
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    """Lowercase words of a text, without common stopwords."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+# =============================================================================
+# BUILD
+# =============================================================================
+
+def read_lesson(path: Path) -> dict:
+    """
+    Pull the title, module and lesson text out of one crawled markdown file.
+
+    Returns None for files without lesson text (e.g. the course README).
+    """
+    lines = path.read_text(encoding="utf-8").splitlines()
+
+    title = next((line[2:].strip() for line in lines if line.startswith("# ")), path.stem)
+    module = next((line.strip("* ") for line in lines if line.startswith("**Module ")), "")
+
+    # The content runs until the next section (Images, Videos, External
+    # Resources) or the footer. Lesson headings are ### and deeper, and "---"
+    # lines inside it are horizontal rules from the lesson, so they are skipped.
+    text_lines = []
+    in_content = False
+    for line in lines:
+        if line.strip() in CONTENT_HEADINGS:
+            in_content = True
+        elif in_content and (line.startswith("## ") or line.strip() == FOOTER):
+            break
+        elif in_content and line.strip() != "---":
+            text_lines.append(line)
+
+    text = "\n".join(text_lines).strip()
+    if not text:
+        return None
+    return {"lesson": title, "module": module, "path": str(path), "text": text}
+
+
+def split_excerpts(text: str, max_words: int = EXCERPT_WORDS) -> list:
+    """Group a lesson's paragraphs into excerpts of at most ~max_words words."""
+    excerpts = []
+    current, current_words = [], 0
+
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        words = len(paragraph.split())
+        if current and current_words + words > max_words:
+            excerpts.append("\n\n".join(current))
+            current, current_words = [], 0
+        current.append(paragraph)
+        current_words += words
+
+    if current:
+        excerpts.append("\n\n".join(current))
+    return excerpts
+
+
+def build_index(input_dir, index_path) -> int:
+    """
+    Index every crawled lesson under input_dir and write the index file.
+
+    Returns:
+        The number of excerpts indexed
+    """
+    excerpts = []
+    for path in sorted(Path(input_dir).rglob("*.md")):
+        lesson = read_lesson(path)
+        if lesson is None:
+            continue
+        for text in split_excerpts(lesson["text"]):
+            excerpts.append({**lesson, "text": text})
+
+    term_counts = [Counter(tokenize(e["lesson"] + "\n" + e["text"])) for e in excerpts]
+    lengths = [sum(counts.values()) for counts in term_counts]
+    average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    # term -> [(excerpt id, term frequency), ...]
+    postings = {}
+    for excerpt_id, counts in enumerate(term_counts):
+        for term, count in counts.items():
+            postings.setdefault(term, []).append((excerpt_id, count))
+
+    vocabulary = {}
+    posting_bytes = bytearray()
+    excerpt_count = len(excerpts)
+    for term in sorted(postings):
+        entries = postings[term]
+        idf = math.log(1 + (excerpt_count - len(entries) + 0.5) / (len(entries) + 0.5))
+        vocabulary[term] = [len(posting_bytes) // POSTING.size, len(entries)]
+        for excerpt_id, tf in entries:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[excerpt_id] / average_length)
+            posting_bytes += POSTING.pack(excerpt_id, idf * tf * (BM25_K1 + 1) / (tf + norm))
+
+    excerpts_json = json.dumps(excerpts, ensure_ascii=False).encode("utf-8")
+    vocabulary_json = json.dumps(vocabulary, ensure_ascii=False).encode("utf-8")
+
+    temp_path = f"{index_path}.tmp{os.getpid()}"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, excerpt_count, len(vocabulary),
+                            len(excerpts_json), len(vocabulary_json), len(posting_bytes)))
+        f.write(excerpts_json)
+        f.write(vocabulary_json)
+        f.write(posting_bytes)
+    os.replace(temp_path, index_path)
+
+    return excerpt_count
+
+
+# =============================================================================
+# SEARCH
+# =============================================================================
+
+class LessonIndex:
+    """Read-only, memory-mapped BM25 index of lesson excerpts."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.excerpt_count, self.term_count, excerpts_size, vocabulary_size, postings_size = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a lesson index")
+
+        start = HEADER.size
+        self.excerpts = json.loads(self._map[start:start + excerpts_size])
+        start += excerpts_size
+        self.vocabulary = json.loads(self._map[start:start + vocabulary_size])
+        start += vocabulary_size
+        self._postings = memoryview(self._map)[start:start + postings_size]
+
+    def search(self, text: str, limit: int = 1) -> list:
+        """
+        Find the excerpts that best match a text.
+
+        Returns:
+            list of excerpt dicts (lesson, module, path, text) with a "score"
+            key, best match first
+        """
+        scores = {}
+        for term in set(tokenize(text)):
+            entry = self.vocabulary.get(term)
+            if entry is None:
+                continue
+            first, count = entry
+            chunk = self._postings[first * POSTING.size:(first + count) * POSTING.size]
+            for excerpt_id, weight in POSTING.iter_unpack(chunk):
+                scores[excerpt_id] = scores.get(excerpt_id, 0.0) + weight
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [{**self.excerpts[excerpt_id], "score": score} for excerpt_id, score in best]
+
+    def close(self):
+        self._postings.release()
+        self._map.close()
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Shorten a text to roughly max_tokens OpenAI tokens.
+
+    Uses the usual rule of thumb of ~0.75 words per token, cutting at a
+    word boundary.
+    """
+    max_words = int(max_tokens * 0.75)
+    words = text.split()
+    if len(words) <= max_words:
+        return text
+    return " ".join(words[:max_words]) + " ..."
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the lesson excerpt index.")
+    parser.add_argument("--input", help="Crawler output directory to index.")
+    parser.add_argument("--index", default="data/lesson_index.bin", help="Index file path.")
+    parser.add_argument("--query", help="Search the index for this text.")
+    args = parser.parse_args()
+
+    if args.input:
+        count = build_index(args.input, args.index)
+        print(f"Indexed {count} excerpts into {args.index}")
+
+    if args.query:
+        index = LessonIndex(args.index)
+        started = time.perf_counter()
+        results = index.search(args.query)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for result in results:
+            print(f"[{result['score']:.2f}] {result['lesson']} ({result['module']})")
+            print(result["text"])
+        print(f"Search took {elapsed_ms:.3f} ms")
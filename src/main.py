@@ -3,6 +3,8 @@ import argparse
 import logging
 
 from crawler import Rise360Crawler
+from crawl_blocking import DEFAULT_PROFILE, PROFILES
+from crawl_readiness import ReadinessTimeouts
 
 # Configure logging
 logging.basicConfig(
@@ -19,17 +21,126 @@ async def main():
     Main function to run the Rise360 crawler.
     """
     parser = argparse.ArgumentParser(description="Crawl a Rise360 course and convert it to Markdown.")
+    parser.add_argument(
+        "--url",
+        default=COURSE_URL,
+        help="Share URL of the Rise360 course to crawl.",
+    )
     parser.add_argument(
         "--output-dir",
         default="output",
         help="The directory to save the output files.",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of lessons to crawl at the same time, each on its own page.",
+    )
+    parser.add_argument(
+        "--lesson-timeout-ms",
+        type=int,
+        default=ReadinessTimeouts.lesson_content,
+        help="How long to wait for a lesson's content to appear.",
+    )
+    parser.add_argument(
+        "--dom-quiet-ms",
+        type=int,
+        default=ReadinessTimeouts.dom_quiet,
+        help="A lesson is ready once its page has not changed for this long.",
+    )
+    parser.add_argument(
+        "--extraction",
+        choices=["script", "per-element", "network"],
+        default="script",
+        help="Extract each lesson with one in-page script, one call per element, or read all "
+             "lessons from the course data the page downloads (falls back to 'script').",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rewrite lessons whose content changed since the last crawl (tracked in crawl_manifest.json).",
+    )
+    parser.add_argument(
+        "--block",
+        choices=list(PROFILES),
+        default=DEFAULT_PROFILE,
+        help="Requests to skip: 'analytics'; 'standard' also skips fonts and video/audio; "
+             "'text' also skips images. Extracted URLs are not affected.",
+    )
+    parser.add_argument(
+        "--download-assets",
+        action="store_true",
+        help="Download images and videos to output/assets and link the markdown to them.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip lessons finished by an earlier, interrupted run (tracked in crawl_journal.json).",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="Rounds of retrying failed lessons at the end of the crawl.",
+    )
+    parser.add_argument(
+        "--retry-backoff",
+        type=float,
+        default=5.0,
+        help="Seconds to wait before the first retry round; doubles every round.",
+    )
+    parser.add_argument(
+        "--convert-workers",
+        type=int,
+        default=2,
+        help="Processes converting lesson HTML to structured markdown (0: plain text only).",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=8,
+        help="Extracted lessons that may wait for rendering/writing before the browser pauses.",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Time every crawl step into crawl_trace.jsonl and log a per-lesson summary.",
+    )
+    parser.add_argument(
+        "--trace-slowest",
+        type=int,
+        default=0,
+        help="Keep Playwright traces (in traces/) of this many of the slowest lessons.",
+    )
+    har = parser.add_mutually_exclusive_group()
+    har.add_argument(
+        "--record-har",
+        metavar="DIR",
+        help="Save the crawl's network traffic as HAR archives in DIR.",
+    )
+    har.add_argument(
+        "--replay-har",
+        metavar="DIR",
+        help="Crawl from HAR archives recorded with --record-har, without network.",
+    )
     args = parser.parse_args()
 
-    logging.info(f"Starting crawl for course: {COURSE_URL}")
+    timeouts = ReadinessTimeouts(lesson_content=args.lesson_timeout_ms, dom_quiet=args.dom_quiet_ms)
+
+    logging.info(f"Starting crawl for course: {args.url}")
 
     # Use async with to properly initialize and cleanup
-    async with Rise360Crawler(COURSE_URL, args.output_dir) as crawler:
+    async with Rise360Crawler(
+        args.url, args.output_dir, concurrency=args.concurrency, timeouts=timeouts,
+        extraction=args.extraction, incremental=args.incremental, block_profile=args.block,
+        download_assets=args.download_assets, resume=args.resume,
+        max_retries=args.retries, retry_backoff=args.retry_backoff,
+        convert_workers=args.convert_workers, queue_size=args.queue_size,
+        trace=args.trace, trace_slowest=args.trace_slowest,
+        har_dir=args.record_har or args.replay_har,
+        har_mode='record' if args.record_har else 'replay' if args.replay_har else None,
+    ) as crawler:
         await crawler.run()
 
     logging.info("Crawling finished.")
@@ -0,0 +1,263 @@
+"""
+NMO Training Bot - Answer Normalization
+=======================================
+
+Trainees type the same answer in many ways: "I don't know", "dont know",
+"IDK", "not sure"... To the evaluation cache those are all different
+answers. This module turns every answer into a canonical form BEFORE it is
+evaluated, so equivalent answers share one cache entry.
+
+The pipeline, in order:
+    1. Unicode folding: accents removed, curly quotes straightened,
+       everything lowercased ("Café" -> "cafe")
+    2. Punctuation: apostrophes dropped ("don't" -> "dont"), other
+       punctuation becomes a space
+    3. Whitespace collapsed to single spaces
+    4. Entity aliases replaced inside the answer (e.g. area nicknames ->
+       official area names), from data/entity_aliases.csv
+    5. Whole-answer synonyms replaced ("idk" -> "i dont know"), from
+       data/synonyms.csv plus the question's own `synonyms` column
+
+Synonym tables are compiled once per question when the questions are
+loaded (see build_normalizers). Normalizers remember answers they have
+already seen, and normalize_many/normalize_series handle whole columns of
+answers at once for bulk regrading.
+
+Benchmark:
+    python src/normalize.py --benchmark 1000000
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+import argparse
+import csv
+import random
+import re
+import string
+import time
+import unicodedata
+from pathlib import Path
+
+import pandas as pd
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SYNONYMS_FILE = PROJECT_ROOT / "data" / "synonyms.csv"
+ENTITY_ALIASES_FILE = PROJECT_ROOT / "data" / "entity_aliases.csv"
+
+# How many distinct answers each normalizer remembers
+MEMO_SIZE = 100_000
+
+# Punctuation separates words...
+_PUNCTUATION = {ord(c): " " for c in string.punctuation}
+
+# ...including the curly quotes, dashes and odd spaces phones produce
+_PUNCTUATION.update({ord(c): " " for c in "\u201c\u201d\u2033\u2010\u2011\u2012\u2013\u2014\u00a0\u202f"})
+
+# ...except apostrophes (straight or curly), which are dropped so "don't"
+# and "dont" match
+_PUNCTUATION.update({ord(c): None for c in "'`\u2018\u2019\u201b\u2032\u200b"})
+
+FOLD_TABLE = str.maketrans(_PUNCTUATION)
+
+
+def fold(text: str) -> str:
+    """
+    Steps 1-3 of the pipeline: Unicode folding, punctuation and whitespace.
+
+    The same for every question, e.g. "  I DON’T know!! " -> "i dont know".
+    """
+    if not text.isascii():
+        # Split accented letters into letter + accent, then drop the accents
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.casefold().translate(FOLD_TABLE).split())
+
+
+# =============================================================================
+# SYNONYM TABLES
+# =============================================================================
+
+def load_synonym_table(path=SYNONYMS_FILE) -> dict:
+    """
+    Read a synonyms file into a dict of folded synonym -> folded canonical.
+
+    The CSV has the columns `canonical` and `synonyms` (separated by |).
+    A missing file simply means no synonyms.
+    """
+    table = {}
+    if not Path(path).exists():
+        return table
+
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            canonical = fold(row["canonical"])
+            for synonym in (row.get("synonyms") or "").split("|"):
+                if synonym.strip():
+                    table[fold(synonym)] = canonical
+    return table
+
+
+def load_entity_aliases(path=ENTITY_ALIASES_FILE) -> dict:
+    """
+    Read the entity alias file into a dict of folded alias -> folded name.
+
+    The CSV has the columns `entity` (e.g. area), `canonical` (the official
+    name) and `aliases` (separated by |).
+    """
+    aliases = {}
+    if not Path(path).exists():
+        return aliases
+
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            canonical = fold(row["canonical"])
+            for alias in (row.get("aliases") or "").split("|"):
+                if alias.strip():
+                    aliases[fold(alias)] = canonical
+    return aliases
+
+
+def parse_question_synonyms(cell) -> dict:
+    """
+    Parse the `synonyms` column of questions.csv.
+
+    Format: groups separated by ; each written as canonical=synonym|synonym
+    Example: "WhatsApp=whats app|wa;SMS Text=sms|texting"
+    """
+    table = {}
+    if not isinstance(cell, str) or not cell.strip():
+        return table
+
+    for group in cell.split(";"):
+        canonical, _, synonyms = group.partition("=")
+        for synonym in synonyms.split("|"):
+            if synonym.strip():
+                table[fold(synonym)] = fold(canonical)
+    return table
+
+
+# =============================================================================
+# NORMALIZER
+# =============================================================================
+
+class AnswerNormalizer:
+    """
+    The full normalization pipeline for one question.
+
+    Call it with an answer to get the canonical form:
+        normalizer("IDK") -> "i dont know"
+    """
+
+    def __init__(self, synonyms: dict = None, aliases: dict = None):
+        self.synonyms = dict(synonyms or {})
+        self.aliases = dict(aliases or {})
+        self._memo = {}
+
+        # One regex that finds every alias, longest first so
+        # "west africa area" wins over "west africa"
+        self._alias_pattern = None
+        if self.aliases:
+            alternatives = "|".join(re.escape(a) for a in sorted(self.aliases, key=len, reverse=True))
+            self._alias_pattern = re.compile(rf"\b(?:{alternatives})\b")
+
+    def __call__(self, answer: str) -> str:
+        normalized = self._memo.get(answer)
+        if normalized is None:
+            normalized = self._normalize(answer)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[answer] = normalized
+        return normalized
+
+    def _normalize(self, answer: str) -> str:
+        text = fold(answer)
+        if self._alias_pattern is not None:
+            text = self._alias_pattern.sub(lambda m: self.aliases[m.group(0)], text)
+        return self.synonyms.get(text, text)
+
+    def normalize_many(self, answers) -> list:
+        """Normalize a list of answers; repeated answers are only processed once."""
+        return [self(answer) for answer in answers]
+
+    def normalize_series(self, answers: pd.Series) -> pd.Series:
+        """
+        Normalize a pandas column of answers for bulk regrading.
+
+        Each distinct answer is normalized once and the results are spread
+        back over the column, so columns with many repeats are very fast.
+        """
+        codes, uniques = pd.factorize(answers.fillna(""))
+        normalized = pd.Index(self.normalize_many(uniques)).take(codes)
+        return pd.Series(normalized, index=answers.index, name=answers.name)
+
+
+def build_normalizers(questions_df: pd.DataFrame) -> dict:
+    """
+    Compile one AnswerNormalizer per question.
+
+    Each question uses the shared synonym and entity alias files plus the
+    synonyms from its own row in questions.csv (question synonyms win).
+
+    Returns:
+        dict of question_id -> AnswerNormalizer
+    """
+    shared_synonyms = load_synonym_table()
+    aliases = load_entity_aliases()
+
+    normalizers = {}
+    for _, row in questions_df.iterrows():
+        synonyms = {**shared_synonyms, **parse_question_synonyms(row.get("synonyms"))}
+        normalizers[row["question_id"]] = AnswerNormalizer(synonyms, aliases)
+    return normalizers
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def _sample_answers(count: int, distinct: int) -> list:
+    """Realistic-looking answers: a few common ones plus many variations."""
+    common = ["I don't know", "IDK", "not sure", "Yes", "yes!", "No", "WhatsApp", "whats app",
+              "SMS Text", "I’m not sure", "Facebook Messenger", "Café gathering"]
+    rng = random.Random(0)
+    variants = [f"{rng.choice(common)} {rng.choice(['', ' ', '.', ' please', ' thanks'])} {i}"
+                for i in range(distinct)]
+    pool = common + variants
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def run_benchmark(count: int):
+    synonyms = {**load_synonym_table(), **parse_question_synonyms("WhatsApp=whats app|wa;SMS Text=sms|texting")}
+    aliases = load_entity_aliases()
+
+    for label, distinct in [("typical (1% distinct)", count // 100), ("worst case (all distinct)", count)]:
+        answers = _sample_answers(count, distinct)
+        if distinct == count:
+            answers = [f"{answer} #{i}" for i, answer in enumerate(answers)]
+
+        normalizer = AnswerNormalizer(synonyms, aliases)
+        started = time.perf_counter()
+        normalizer.normalize_series(pd.Series(answers))
+        elapsed = time.perf_counter() - started
+
+        print(f"{label}: {count:,} answers in {elapsed:.2f} s = {count / elapsed * 60:,.0f} answers/minute")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer normalization tools.")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Time normalizing N answers.")
+    parser.add_argument("answers", nargs="*", help="Answers to normalize and print.")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark)
+
+    normalizer = AnswerNormalizer(load_synonym_table(), load_entity_aliases())
+    for answer in args.answers:
+        print(f"{answer!r} -> {normalizer(answer)!r}")
@@ -0,0 +1,175 @@
+"""
+NMO Training Bot - Speculative Prefetching
+==========================================
+
+While a trainee reads the feedback for question N, the server is idle until
+they click "Continue to Next Question". The Prefetcher uses that time to
+get question N+1 ready:
+
+    1. Compile its evaluation prompt (see evaluation.compile_prompt)
+    2. Open a connection to the OpenAI API (see evaluation.warm_connection)
+    3. For yes/no and multiple choice questions, evaluate the possible
+       answers ahead of time so the real submission is a cache hit
+
+Prefetching must never get in the way of real work, so:
+    - All prefetch jobs share ONE background thread
+    - Only a few jobs may wait in line; extra requests are dropped
+    - Every job can be cancelled (the app cancels it as soon as the trainee
+      submits an answer)
+    - Speculative OpenAI calls are skipped while a real evaluation is running
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import evaluation
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Maximum number of prefetch jobs waiting for the background thread
+PREFETCH_MAX_PENDING = int(os.getenv("NMO_PREFETCH_MAX_PENDING", "4"))
+
+# Maximum number of speculative OpenAI evaluations per question (0 = none)
+PREFETCH_MAX_EVALUATIONS = int(os.getenv("NMO_PREFETCH_MAX_EVALUATIONS", "6"))
+
+# Re-open the API connection if it hasn't been used for this many seconds
+# (idle keep-alive connections are closed by the server after a while)
+CONNECTION_WARM_INTERVAL = 30
+
+
+def candidate_answers(question_type: str, choices) -> list:
+    """
+    List the answers a trainee can give to a question, if there are few.
+
+    Free-text questions have no fixed set of answers, so nothing is returned.
+    """
+    if question_type == "yes_no":
+        return ["Yes", "No"]
+
+    if question_type == "choice" and isinstance(choices, str) and choices:
+        return [c.strip() for c in choices.split("|")]
+
+    return []
+
+
+# =============================================================================
+# PREFETCHER
+# =============================================================================
+
+class PrefetchJob:
+    """Handle for one scheduled prefetch, used to cancel it."""
+
+    def __init__(self, question_id: str):
+        self.question_id = question_id
+        self.cancelled = threading.Event()
+        self.future = None
+
+    def cancel(self):
+        """Stop the job: drop it if it hasn't started, else stop at the next step."""
+        self.cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+
+class Prefetcher:
+    """Runs prefetch jobs on a single background thread. One per process."""
+
+    def __init__(self, max_pending: int = PREFETCH_MAX_PENDING,
+                 max_evaluations: int = PREFETCH_MAX_EVALUATIONS):
+        self.max_pending = max_pending
+        self.max_evaluations = max_evaluations
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nmo-prefetch")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._foreground = 0
+        self._warmed_at = 0.0
+
+    def schedule(self, question: dict, normalizer=None):
+        """
+        Queue a prefetch for a question.
+
+        Args:
+            question: A question row as a dict (question_id, question,
+                correct_answer, feedback_incorrect, question_type, choices)
+            normalizer: The question's AnswerNormalizer, so prefetched
+                answers land under the same cache keys as real submissions
+
+        Returns:
+            PrefetchJob, or None if too many jobs are already waiting
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                logging.info(f"Prefetch queue full, skipping {question.get('question_id')}")
+                return None
+            self._pending += 1
+
+        job = PrefetchJob(question.get("question_id"))
+        job.future = self._executor.submit(self._run, job, question, normalizer)
+        job.future.add_done_callback(self._job_finished)
+        return job
+
+    @contextmanager
+    def foreground(self):
+        """
+        Mark a real (non-speculative) evaluation as in progress.
+
+        While any foreground evaluation runs, prefetch jobs don't start new
+        speculative OpenAI calls.
+        """
+        with self._lock:
+            self._foreground += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._foreground -= 1
+
+    def _job_finished(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def _foreground_busy(self) -> bool:
+        with self._lock:
+            return self._foreground > 0
+
+    def _run(self, job: PrefetchJob, question: dict, normalizer):
+        try:
+            # Step 1: compile the prompt (cached inside evaluation.py)
+            instructions = question.get("feedback_incorrect", "")
+            evaluation.compile_prompt(question["question"], question["correct_answer"], instructions)
+            if job.cancelled.is_set():
+                return
+
+            # Step 2: make sure there is a live connection to the API
+            if time.monotonic() - self._warmed_at > CONNECTION_WARM_INTERVAL:
+                evaluation.warm_connection()
+                self._warmed_at = time.monotonic()
+
+            # Step 3: evaluate the possible answers ahead of time
+            answers = candidate_answers(question.get("question_type", "text"), question.get("choices"))
+            for answer in answers[:self.max_evaluations]:
+                if job.cancelled.is_set() or self._foreground_busy():
+                    return
+                evaluation.evaluate(
+                    question["question"], question["correct_answer"], answer, instructions,
+                    normalized_answer=normalizer(answer) if normalizer else None
+                )
+
+            logging.info(f"Prefetched question {job.question_id}")
+
+        except Exception as e:
+            # Prefetching is only an optimization - never let it break anything
+            logging.warning(f"Prefetch for {job.question_id} failed: {e}")
@@ -0,0 +1,144 @@
+"""
+NMO Training Bot - Compiled Question Bank
+=========================================
+
+When several app processes run side by side (see launch_workers.py), we
+don't want every one of them to re-parse questions.csv. Instead the CSV is
+compiled once into a small binary file that every worker memory-maps
+read-only; the operating system keeps one copy of the file in memory.
+Each worker still copies the records into its own DataFrame (see
+load_questions in app.py), so what is saved is the CSV parsing.
+
+File layout (all integers little-endian):
+
+    MAGIC (8 bytes)            b"NMOQB01\\n"
+    source hash (32 bytes)     SHA-256 of questions.csv, to detect stale files
+    record count (uint32)
+    offsets ((count + 2) x uint64) start of each record, then end of data
+    records                    UTF-8 JSON: the column names first, then one
+                               list of cell values per question
+
+To compile by hand:
+    python src/question_bank.py data/questions.csv data/questions.qbank
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+MAGIC = b"NMOQB01\n"
+HEADER = struct.Struct("<8s32sI")
+OFFSET = struct.Struct("<Q")
+
+
+def file_hash(path) -> bytes:
+    """SHA-256 digest of a file's contents."""
+    return hashlib.sha256(Path(path).read_bytes()).digest()
+
+
+# =============================================================================
+# COMPILE
+# =============================================================================
+
+def compile_question_bank(csv_path, output_path):
+    """
+    Compile questions.csv into a memory-mappable question bank file.
+
+    Empty CSV cells are stored as None. The file is written to a temporary
+    name and renamed, so running workers never see a half-written file.
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+
+    columns, records = rows[0], rows[1:]
+    payloads = [json.dumps(columns).encode("utf-8")]
+    for record in records:
+        payloads.append(json.dumps([value if value != "" else None for value in record]).encode("utf-8"))
+
+    # Records start right after the header and offset table
+    position = HEADER.size + OFFSET.size * (len(payloads) + 1)
+    offsets = []
+    for payload in payloads:
+        offsets.append(position)
+        position += len(payload)
+    offsets.append(position)
+
+    temp_path = f"{output_path}.tmp{os.getpid()}"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, file_hash(csv_path), len(records)))
+        for offset in offsets:
+            f.write(OFFSET.pack(offset))
+        for payload in payloads:
+            f.write(payload)
+    os.replace(temp_path, output_path)
+
+
+# =============================================================================
+# LOAD
+# =============================================================================
+
+class QuestionBank:
+    """Read-only, memory-mapped view of a compiled question bank."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.source_hash, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a compiled question bank")
+
+        self.columns = self._read(0)
+
+    def _read(self, index: int):
+        start = OFFSET.unpack_from(self._map, HEADER.size + OFFSET.size * index)[0]
+        end = OFFSET.unpack_from(self._map, HEADER.size + OFFSET.size * (index + 1))[0]
+        return json.loads(self._map[start:end])
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> dict:
+        """Return one question as a dict of column name -> value."""
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return dict(zip(self.columns, self._read(index + 1)))
+
+    def records(self) -> list:
+        """Return all questions as lists of cell values, in CSV order."""
+        return [self._read(i + 1) for i in range(self.count)]
+
+    def is_stale(self, csv_path) -> bool:
+        """True if questions.csv has changed since this file was compiled."""
+        return file_hash(csv_path) != self.source_hash
+
+    def close(self):
+        self._map.close()
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile questions.csv into a memory-mapped question bank.")
+    parser.add_argument("csv_path", help="Path to questions.csv")
+    parser.add_argument("output_path", help="Where to write the compiled question bank")
+    args = parser.parse_args()
+
+    compile_question_bank(args.csv_path, args.output_path)
+    print(f"Compiled {len(QuestionBank(args.output_path))} questions to {args.output_path}")
@@ -0,0 +1,358 @@
+"""
+NMO Training Bot - Evaluation Replay
+====================================
+
+Re-drives captured evaluation traffic (see traffic_capture.py) through the
+evaluation code of the current checkout, against a local mock of the
+OpenAI API. Comparing the reports of two builds shows how a change affects
+latency, cache hit-rate and verdicts on real answer distributions.
+
+The mock server answers each request with the verdict that was recorded
+for the same question and answer, so replays are repeatable and free.
+
+Typical use (from project root):
+
+    # 1. Replay the capture on the current build
+    python src/replay.py run captures/*.jsonl.gz --output before.json
+
+    # 2. Switch to the other build (e.g. git checkout my-branch) and replay again
+    python src/replay.py run captures/*.jsonl.gz --output after.json
+
+    # 3. Compare
+    python src/replay.py compare before.json after.json
+
+`--speed 1` keeps the original pacing, `--speed 10` is ten times faster,
+and the default `--speed 0` replays one evaluation after another as fast as
+possible (fully deterministic). The mock server can also be run on its
+own: python src/replay.py mock-server captures/*.jsonl.gz --port 8765
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from traffic_capture import read_records
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# How the mock server finds the question and answer inside a prompt
+QUESTION_PATTERN = re.compile(r"QUESTION: (.*?)\n\nCORRECT ANSWER CRITERIA:", re.DOTALL)
+ANSWER_MARKER = "TRAINEE'S ANSWER: "
+ANSWER_END_MARKER = "\n\nRemember to respond with JSON only."
+
+# Returned by the mock when nothing was recorded for a question/answer
+UNKNOWN_VERDICT = {
+    "is_correct": False,
+    "feedback": "[mock] No recorded verdict for this answer.",
+    "refer_to_trainer": False
+}
+
+
+# =============================================================================
+# MOCK OPENAI SERVER
+# =============================================================================
+
+def build_verdicts(records: list) -> dict:
+    """
+    Map (question, user_answer) -> (verdict, typical latency in seconds).
+
+    Latency is the median of the recorded cache misses, i.e. real API calls.
+    """
+    verdicts, latencies = {}, {}
+    for record in records:
+        key = (record["question"], record["user_answer"])
+        verdicts[key] = record["result"]
+        if record.get("cache") == "miss":
+            latencies.setdefault(key, []).append(record["latency_ms"] / 1000)
+
+    return {
+        key: (verdict, statistics.median(latencies[key]) if key in latencies else 0.0)
+        for key, verdict in verdicts.items()
+    }
+
+
+class MockOpenAIServer:
+    """
+    A tiny HTTP server that speaks just enough of the OpenAI API for the
+    evaluation code: chat completions and model lookup.
+    """
+
+    def __init__(self, verdicts: dict, port: int = 0, latency_scale: float = 1.0):
+        self.verdicts = verdicts
+        self.latency_scale = latency_scale
+        self.unknown_requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, body: dict) -> dict:
+        """Build a chat completion for a request body."""
+        prompt = body["messages"][-1]["content"]
+        question_match = QUESTION_PATTERN.search(prompt)
+        answer = prompt.rpartition(ANSWER_MARKER)[2]
+        if answer.endswith(ANSWER_END_MARKER):
+            answer = answer[:-len(ANSWER_END_MARKER)]
+
+        key = (question_match.group(1) if question_match else "", answer)
+        verdict, latency = self.verdicts.get(key, (None, 0.0))
+        if verdict is None:
+            self.unknown_requests += 1
+            verdict = UNKNOWN_VERDICT
+
+        time.sleep(latency * self.latency_scale)
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(verdict)},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not self.path.endswith("/chat/completions"):
+                    return self._send(404, {"error": {"message": "Not found"}})
+                length = int(self.headers.get("Content-Length", 0))
+                self._send(200, mock.respond(json.loads(self.rfile.read(length))))
+
+            def do_GET(self):
+                # Used by evaluation.warm_connection()
+                model = self.path.rstrip("/").rpartition("/")[2]
+                self._send(200, {"id": model, "object": "model", "created": 0, "owned_by": "mock"})
+
+            def _send(self, status: int, payload: dict):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # Keep the replay output readable
+
+        return Handler
+
+
+# =============================================================================
+# REPLAY
+# =============================================================================
+
+def current_build() -> str:
+    """Short git commit of the checkout being replayed, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def latency_summary(latencies: list) -> dict:
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "mean": round(statistics.mean(ordered), 3),
+        "p50": round(pick(0.50), 3),
+        "p95": round(pick(0.95), 3),
+        "p99": round(pick(0.99), 3)
+    }
+
+
+def run_replay(records: list, base_url: str, speed: float, concurrency: int, label: str) -> dict:
+    """
+    Replay records through this checkout's evaluation code.
+
+    Must run before anything else imports evaluation.py, because the
+    environment decides which API, cache and rate limiter it uses.
+    """
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "replay")
+    os.environ["NMO_OPENAI_RPM"] = "0"        # Don't measure the rate limiter's waits
+    os.environ.pop("NMO_SHARED_STORE", None)  # Start from an empty, private cache
+    os.environ.pop("NMO_CAPTURE_DIR", None)   # Don't capture the replay itself
+
+    import pandas as pd
+    import evaluation
+    from normalize import build_normalizers
+
+    # Normalize answers the way THIS build would
+    questions_df = pd.read_csv(PROJECT_ROOT / "data" / "questions.csv")
+    normalizers = build_normalizers(questions_df)
+    normalizer_by_question = {
+        row["question"]: normalizers[row["question_id"]] for _, row in questions_df.iterrows()
+    }
+
+    def replay_one(index: int, record: dict) -> dict:
+        normalizer = normalizer_by_question.get(record["question"])
+        started = time.perf_counter()
+        result, cache_hit = evaluation.evaluate_with_outcome(
+            record["question"], record["correct_answer"], record["user_answer"], record["instructions"],
+            normalizer(record["user_answer"]) if normalizer else evaluation.fold(record["user_answer"])
+        )
+        return {
+            "index": index,
+            "question": record["question"][:60],
+            "user_answer": record["user_answer"][:60],
+            "is_correct": result["is_correct"],
+            "captured_is_correct": record["result"]["is_correct"],
+            "cache": "hit" if cache_hit else "miss",
+            "latency_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    results = []
+    if speed <= 0:
+        # One after another: the cache sees answers in exactly the captured order
+        results = [replay_one(i, record) for i, record in enumerate(records)]
+    else:
+        # Keep the original gaps between evaluations (divided by speed)
+        first_ts = records[0]["ts"] if records else 0
+        replay_start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = []
+            for i, record in enumerate(records):
+                delay = (record["ts"] - first_ts) / speed - (time.monotonic() - replay_start)
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(executor.submit(replay_one, i, record))
+            results = [future.result() for future in futures]
+
+    latencies = [r["latency_ms"] for r in results]
+    hits = sum(r["cache"] == "hit" for r in results)
+    drift = sum(r["is_correct"] != r["captured_is_correct"] for r in results)
+
+    return {
+        "build": label,
+        "records": len(results),
+        "speed": speed,
+        "latency_ms": latency_summary(latencies),
+        "hit_rate": round(hits / len(results), 4) if results else 0.0,
+        "verdict_drift_vs_capture": round(drift / len(results), 4) if results else 0.0,
+        "results": results
+    }
+
+
+def compare_reports(before: dict, after: dict):
+    """Print latency, hit-rate and verdict differences between two reports."""
+    print(f"{'':24}{before['build']:>14}{after['build']:>14}{'change':>14}")
+
+    rows = [("hit rate", before["hit_rate"], after["hit_rate"])]
+    for stat in ("mean", "p50", "p95", "p99"):
+        rows.append((f"latency {stat} (ms)", before["latency_ms"].get(stat, 0), after["latency_ms"].get(stat, 0)))
+    rows.append(("drift vs capture", before["verdict_drift_vs_capture"], after["verdict_drift_vs_capture"]))
+
+    for name, a, b in rows:
+        print(f"{name:24}{a:>14.3f}{b:>14.3f}{b - a:>+14.3f}")
+
+    if before["records"] != after["records"]:
+        print(f"\nWarning: reports cover different captures ({before['records']} vs {after['records']} records)")
+        return
+
+    changed = [
+        (a, b) for a, b in zip(before["results"], after["results"]) if a["is_correct"] != b["is_correct"]
+    ]
+    share = len(changed) / before["records"] if before["records"] else 0.0
+    print(f"\nVerdicts that changed between builds: {len(changed)} of {before['records']} ({share:.2%})")
+    for a, b in changed[:10]:
+        print(f"  #{a['index']}: {a['user_answer']!r} on {a['question']!r}: {a['is_correct']} -> {b['is_correct']}")
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured evaluation traffic.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Replay a capture on this build and write a report.")
+    run.add_argument("logs", nargs="+", help="Capture files (*.jsonl.gz).")
+    run.add_argument("--output", required=True, help="Where to write the JSON report.")
+    run.add_argument("--speed", type=float, default=0, help="Pace multiplier (0 = as fast as possible).")
+    run.add_argument("--concurrency", type=int, default=8, help="Parallel evaluations when pacing.")
+    run.add_argument("--latency-scale", type=float, default=1.0, help="Multiply the mock's recorded API latency.")
+    run.add_argument("--base-url", help="Use this OpenAI-compatible API instead of the built-in mock.")
+    run.add_argument("--label", help="Name of this build in the report (default: git commit).")
+
+    mock = commands.add_parser("mock-server", help="Serve recorded verdicts as a mock OpenAI API.")
+    mock.add_argument("logs", nargs="+", help="Capture files (*.jsonl.gz).")
+    mock.add_argument("--port", type=int, default=8765)
+    mock.add_argument("--latency-scale", type=float, default=1.0)
+
+    compare = commands.add_parser("compare", help="Compare two replay reports.")
+    compare.add_argument("before")
+    compare.add_argument("after")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        compare_reports(json.loads(Path(args.before).read_text()), json.loads(Path(args.after).read_text()))
+        return
+
+    records = read_records(args.logs)
+    server = MockOpenAIServer(build_verdicts(records), getattr(args, "port", 0), args.latency_scale)
+
+    if args.command == "mock-server":
+        print(f"Mock OpenAI API with {len(server.verdicts)} recorded verdicts at {server.base_url}")
+        server.serve_forever()
+        return
+
+    if not args.base_url:
+        server.start()
+    try:
+        report = run_replay(records, args.base_url or server.base_url, args.speed,
+                            args.concurrency, args.label or current_build())
+    finally:
+        if not args.base_url:
+            server.stop()
+
+    report["mock_unknown_requests"] = server.unknown_requests
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"Replayed {report['records']} evaluations: hit rate {report['hit_rate']:.2%}, "
+          f"p50 {report['latency_ms'].get('p50', 0)} ms, drift vs capture {report['verdict_drift_vs_capture']:.2%}")
+    print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
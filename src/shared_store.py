@@ -0,0 +1,167 @@
+"""
+NMO Training Bot - Shared Store for Multiple Workers
+====================================================
+
+When several app processes serve the same cohort (see launch_workers.py),
+each one would otherwise have its own cold evaluation cache and its own
+idea of how many OpenAI requests were made. This module keeps both in one
+SQLite database file that every worker on the machine can open.
+
+SQLite runs in WAL mode so readers never block each other, and every
+write is a short transaction. Each thread gets its own connection, because
+SQLite connections must not be shared between threads.
+
+Enable it by pointing NMO_SHARED_STORE at a file path, e.g.:
+    NMO_SHARED_STORE=/var/run/nmo/shared.sqlite3 streamlit run src/app.py
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+import json
+import sqlite3
+import threading
+import time
+
+# =============================================================================
+# CONNECTIONS
+# =============================================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluation_cache (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS evaluation_cache_used_at ON evaluation_cache (used_at);
+CREATE TABLE IF NOT EXISTS rate_limit (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class SharedStore:
+    """Opens (and creates, if needed) the shared SQLite database."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self.connection().executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        """Return this thread's connection to the database."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: we manage transactions explicitly
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+# =============================================================================
+# EVALUATION CACHE
+# =============================================================================
+
+class SharedEvaluationCache:
+    """
+    Evaluation cache shared by every worker through the SQLite store.
+
+    Works like evaluation.EvaluationCache: least recently used entries are
+    dropped once there are more than max_size.
+    """
+
+    def __init__(self, store: SharedStore, max_size: int):
+        self.store = store
+        self.max_size = max_size
+
+    def get(self, key: str):
+        conn = self.store.connection()
+        row = conn.execute("SELECT result FROM evaluation_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE evaluation_cache SET used_at = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, result: dict):
+        conn = self.store.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO evaluation_cache (key, result, used_at) VALUES (?, ?, ?)",
+                (key, json.dumps(result), time.time())
+            )
+            conn.execute(
+                "DELETE FROM evaluation_cache WHERE key IN ("
+                " SELECT key FROM evaluation_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def __contains__(self, key: str) -> bool:
+        row = self.store.connection().execute(
+            "SELECT 1 FROM evaluation_cache WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+
+
+# =============================================================================
+# RATE LIMITER
+# =============================================================================
+
+class SharedRateLimiter:
+    """
+    Token bucket shared by every worker through the SQLite store.
+
+    Works like evaluation.RateLimiter, but the bucket lives in the database,
+    so the limit applies to all workers together.
+    """
+
+    def __init__(self, store: SharedStore, requests_per_minute: int, name: str = "openai"):
+        self.store = store
+        self.requests_per_minute = requests_per_minute
+        self.name = name
+
+    def acquire(self):
+        """Wait until a request may be sent, then use up one token."""
+        if self.requests_per_minute <= 0:
+            return
+
+        capacity = float(self.requests_per_minute)
+        per_second = capacity / 60.0
+        conn = self.store.connection()
+
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM rate_limit WHERE name = ?", (self.name,)
+                ).fetchone()
+                tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * per_second)
+
+                if tokens >= 1:
+                    tokens -= 1
+                    wait = 0
+                else:
+                    wait = (1 - tokens) / per_second
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limit (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    (self.name, tokens, now)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            if not wait:
+                return
+            time.sleep(wait)
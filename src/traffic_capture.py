@@ -0,0 +1,198 @@
+"""
+NMO Training Bot - Evaluation Traffic Capture
+=============================================
+
+Opt-in recording of real evaluation traffic, so it can be replayed later
+against a mock LLM server (see replay.py) to measure the effect of grading
+changes on realistic answers.
+
+Turn it on by setting NMO_CAPTURE_DIR:
+    NMO_CAPTURE_DIR=captures streamlit run src/app.py
+
+Every evaluation the trainee triggers becomes one JSON record:
+    - ts: When it happened (Unix time)
+    - question, correct_answer, instructions, user_answer, normalized_answer
+    - result: What the trainee was shown
+    - cache: "hit" or "miss"
+    - latency_ms: How long the evaluation took
+
+Records are appended to gzip-compressed JSON-lines files. They are written
+in small batches (each batch is its own gzip member, which gzip readers
+join back together), and a new file is started once the current one
+reaches NMO_CAPTURE_MAX_BYTES.
+
+Trainees' answers can contain personal details, so every record passes
+through the scrubber hooks before it is written. Emails and phone numbers
+are scrubbed by default; add your own with register_scrubber(), or list
+them in NMO_CAPTURE_SCRUBBERS as "module:function,module:function".
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+
+import atexit
+import gzip
+import importlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from normalize import fold
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+CAPTURE_DIR = os.getenv("NMO_CAPTURE_DIR")
+
+# Start a new file once the current one is this big (compressed)
+CAPTURE_MAX_BYTES = int(os.getenv("NMO_CAPTURE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Write buffered records after this many records or seconds
+FLUSH_RECORDS = 50
+FLUSH_SECONDS = 5.0
+
+# Fields of a record that may contain text typed by the trainee
+FREE_TEXT_FIELDS = ("user_answer", "normalized_answer")
+
+
+# =============================================================================
+# PII SCRUBBING
+# =============================================================================
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+PHONE_PATTERN = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+
+_scrubbers = []
+
+
+def register_scrubber(scrubber):
+    """
+    Add a function that cleans a record before it is written.
+
+    The function receives the record dict and returns the cleaned dict.
+    """
+    _scrubbers.append(scrubber)
+
+
+def scrub_contact_details(record: dict) -> dict:
+    """Default scrubber: replace emails and phone numbers in free text."""
+    for field in FREE_TEXT_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            value = EMAIL_PATTERN.sub("[EMAIL]", value)
+            record[field] = PHONE_PATTERN.sub("[PHONE]", value)
+    return record
+
+
+def scrub(record: dict) -> dict:
+    """
+    Run every scrubber on a record.
+
+    normalized_answer is derived from user_answer, and folding removes the
+    "@" and "." an email pattern needs, so scrubbers can't reliably find
+    personal details in it. When scrubbing changed user_answer, the
+    normalized answer is re-derived (folded) from the scrubbed answer.
+    replay.py normalizes the scrubbed user_answer again, so the two agree.
+    """
+    user_answer = record.get("user_answer")
+    for scrubber in _scrubbers:
+        record = scrubber(record)
+    if "normalized_answer" in record and record.get("user_answer") != user_answer:
+        record["normalized_answer"] = fold(record["user_answer"])
+    return record
+
+
+def _load_configured_scrubbers():
+    register_scrubber(scrub_contact_details)
+
+    for spec in filter(None, os.getenv("NMO_CAPTURE_SCRUBBERS", "").split(",")):
+        module_name, _, function_name = spec.strip().partition(":")
+        register_scrubber(getattr(importlib.import_module(module_name), function_name))
+
+
+_load_configured_scrubbers()
+
+
+# =============================================================================
+# CAPTURE LOG
+# =============================================================================
+
+class CaptureLog:
+    """Thread-safe, append-only, rotating log of compressed JSON records."""
+
+    def __init__(self, directory, max_bytes: int = CAPTURE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._flushed_at = time.monotonic()
+        self._file_number = 0
+        self._path = self._new_path()
+
+    def _new_path(self) -> Path:
+        self._file_number += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return self.directory / f"capture-{stamp}-{os.getpid()}-{self._file_number:04d}.jsonl.gz"
+
+    def append(self, record: dict):
+        """Scrub a record and queue it for writing."""
+        line = json.dumps(scrub(dict(record)), ensure_ascii=False)
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= FLUSH_RECORDS or time.monotonic() - self._flushed_at >= FLUSH_SECONDS:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._flushed_at = time.monotonic()
+        if not self._buffer:
+            return
+
+        data = ("\n".join(self._buffer) + "\n").encode("utf-8")
+        self._buffer = []
+
+        # Each flush appends one complete gzip member, so the file is
+        # always readable even if the process dies later
+        with open(self._path, "ab") as f:
+            f.write(gzip.compress(data))
+
+        if self._path.stat().st_size >= self.max_bytes:
+            self._path = self._new_path()
+
+
+def read_records(paths) -> list:
+    """Read captured records from one or more capture files, oldest first."""
+    records = []
+    for path in sorted(Path(p) for p in paths):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    records.sort(key=lambda record: record["ts"])
+    return records
+
+
+# The process-wide log, or None when capture is off
+capture_log = None
+if CAPTURE_DIR:
+    capture_log = CaptureLog(CAPTURE_DIR)
+    atexit.register(capture_log.flush)
+
+
+def record(entry: dict):
+    """Capture one evaluation (does nothing unless capture is enabled)."""
+    if capture_log is None:
+        return
+    try:
+        capture_log.append(entry)
+    except Exception as e:
+        # Capturing must never break grading
+        logging.warning(f"Could not capture evaluation: {e}")